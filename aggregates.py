@@ -0,0 +1,147 @@
+"""Tables of the "Les Exoplanètes habitables" page, computed once per dataset version.
+
+The artifacts only hold counts, plus the number of rows and a hash of their
+content. A catalog whose previous rows are all unchanged and which only has
+planets appended after them is updated by counting the new rows and adding
+them to the previous version; any other change rebuilds the tables.
+``python aggregates.py`` builds them for the data currently in the store.
+"""
+import hashlib
+import json
+import os
+from collections import Counter
+
+import pandas as pd
+
+import data_store
+from profiling import timed
+
+
+AGGREGATE_DIR = os.path.join(data_store.ARTIFACT_DIR, 'aggregates')
+LATEST = 'latest.json'
+
+# colonnes nécessaires à la construction des agrégats
+PLANET_COLS = ('planet_id', 'pl_name', 'hostname', 'sy_dist', 'P_HABITABLE', 'S_CONSTELLATION')
+PHL_COLS = ('planet_id', 'S_TYPE_TEMP', 'P_TYPE', 'S_AGE', 'P_DISTANCE', 'S_TEMPERATURE')
+
+STAR_TYPES = ['O', 'B', 'A', 'F', 'G', 'K', 'M']
+PLANET_TYPES = ['Miniterran', 'Subterran', 'Terran', 'Superterran', 'Neptunian', 'Jovian']
+AGE_LABELS = {0: '<2', 2: '2-4', 4: '4-6', 6: '6-8', 8: '8-10', 10: '+10'}
+
+
+@timed('pd.merge')
+def merge_zone(planets, phl_sample):
+    # integer join on the ids given at ingestion (see data_store.assign_ids)
+    return pd.merge(planets, phl_sample, on=data_store.ID_COL, how='left')
+
+
+def age_bins(ages):
+    # tranches de 2 milliards d'années, tout ce qui dépasse 10 est regroupé
+    return ((ages // 2) * 2).clip(upper=10)
+
+
+def _counts(series):
+    return {str(k): int(v) for k, v in series.value_counts().items()}
+
+
+def rows_digest(zone_hab):
+    # content hash of the rows, in their order
+    return hashlib.sha256(pd.util.hash_pandas_object(zone_hab, index=False).values.tobytes()).hexdigest()
+
+
+def count_tables(zone_hab):
+    # the habitable zone and the nearest planets are queried on the index (see zone_index.py)
+    habit = zone_hab[zone_hab['P_HABITABLE'].isin([1, 2])]
+    return {
+        'rows': len(zone_hab),
+        'counts': {
+            'S_TYPE_TEMP': {'all': _counts(zone_hab['S_TYPE_TEMP']), 'hab': _counts(habit['S_TYPE_TEMP'])},
+            'S_AGE': {'all': _counts(age_bins(zone_hab['S_AGE']).astype('Int64')),
+                      'hab': _counts(age_bins(habit['S_AGE']).astype('Int64'))},
+            'P_TYPE': {'all': _counts(zone_hab['P_TYPE']), 'hab': _counts(habit['P_TYPE'])},
+        },
+        'constellations': habit[['S_CONSTELLATION', 'hostname', 'pl_name']].dropna().values.tolist(),
+    }
+
+
+def combine(tables, delta):
+    # adds the counts of the appended planets to the tables of the previous version
+    counts = {}
+    for col, groups in tables['counts'].items():
+        counts[col] = {g: dict(Counter(groups[g]) + Counter(delta['counts'][col][g])) for g in groups}
+
+    return {
+        'rows': tables['rows'] + delta['rows'],
+        'counts': counts,
+        'constellations': tables['constellations'] + delta['constellations'],
+    }
+
+
+def aggregate_path(version):
+    return os.path.join(AGGREGATE_DIR, f'{version}.json')
+
+
+def _read(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write(tables):
+    os.makedirs(AGGREGATE_DIR, exist_ok=True)
+    for path in (aggregate_path(tables['version']), os.path.join(AGGREGATE_DIR, LATEST)):
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(tables, f)
+        os.replace(tmp, path)
+
+
+@timed('aggregates')
+def materialize(nea_version, phl_version, load_zone):
+    # load_zone() returns the merged NEA/PHL frame, it is only called when the tables must be (re)built
+    version = f'{nea_version}-{phl_version}'
+    tables = _read(aggregate_path(version))
+    if tables is not None:
+        return tables
+
+    zone_hab = load_zone()
+    previous = _read(os.path.join(AGGREGATE_DIR, LATEST))
+    known = previous['rows'] if previous and 'digest' in previous else None
+    if (known is not None and previous['phl_version'] == phl_version and known <= len(zone_hab)
+            and rows_digest(zone_hab.iloc[:known]) == previous['digest']):
+        # les lignes de la version précédente sont inchangées : seules les planètes ajoutées sont comptées
+        tables = combine(previous, count_tables(zone_hab.iloc[known:]))
+    else:
+        tables = count_tables(zone_hab)
+
+    tables.update(version=version, nea_version=nea_version, phl_version=phl_version,
+                  digest=rows_digest(zone_hab))
+    # tables computed before the first ingestion: the version they were read from is not known
+    if 'remote' not in version:
+        _write(tables)
+    return tables
+
+
+def share_table(tables, col, index, labels=None):
+    # percentages of all the exoplanets and of the habitable ones, per category
+    counts = tables['counts'][col]
+    tab = pd.DataFrame({'Exoplanètes': pd.Series(counts['all'], dtype='float64'),
+                        'Habitables': pd.Series(counts['hab'], dtype='float64')})
+    tab = (tab * 100 / tab.sum()).reindex(index=[str(i) for i in index]).fillna(0).round(2)
+    if labels:
+        tab.rename(index={str(k): v for k, v in labels.items()}, inplace=True)
+    return tab
+
+
+def load_tables(data_dir=None):
+    nea_version = data_store.dataset_version('nea', data_dir=data_dir)
+    phl_version = data_store.dataset_version('phl', data_dir=data_dir)
+    return materialize(nea_version, phl_version,
+                       lambda: merge_zone(data_store.load('nea', PLANET_COLS, data_dir, version=nea_version),
+                                          data_store.load('phl', PHL_COLS, data_dir, version=phl_version)))
+
+
+if __name__ == '__main__':
+    tables = load_tables()
+    print(f"agrégats {tables['version']} : {tables['rows']} planètes")
@@ -0,0 +1,193 @@
+"""Benchmarks of the data work of every page, without a browser.
+
+    python bench.py --scales 1 10 100 --output bench.json
+    python bench.py --baseline bench.json
+
+The local catalogs (see data_store.py) are replicated 1x, 10x, 100x into
+temporary fixture stores. Every stage of each ``categorie`` branch is run
+cold on them, and its wall time, peak traced memory and retained
+allocations are written as JSON. With ``--baseline``, the results are
+compared with a previous run and the command fails on a regression.
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+import pyarrow as pa
+
+import aggregates
+import cache
+import data_store
+import derived
+import figures
+import model_store
+
+
+def _import(module):
+    # cold import of a page in a new interpreter, as on the first visit after a restart
+    return lambda nea, phl: subprocess.run([sys.executable, '-c', f'import {module}'], check=True, cwd=data_store.ROOT_DIR)
+
+
+def _accueil_load(nea, phl):
+    return data_store.load('nea', derived.ACCUEIL_COLS)
+
+
+def _observer_load(nea, phl):
+    return data_store.load('nea', derived.OBSERVER_COLS)
+
+
+def _habitable_figures(nea, phl):
+    return [figures.constellations(nea, phl), figures.habitable_zone(nea, phl),
+            figures.star_types(nea, phl), figures.star_ages(nea, phl), figures.planet_types(nea, phl)]
+
+
+def _habitable_shares(nea, phl):
+    tables = derived.habitable_tables(nea, phl)
+    return [aggregates.share_table(tables, 'S_TYPE_TEMP', aggregates.STAR_TYPES),
+            aggregates.share_table(tables, 'S_AGE', aggregates.AGE_LABELS, labels=aggregates.AGE_LABELS),
+            aggregates.share_table(tables, 'P_TYPE', aggregates.PLANET_TYPES)]
+
+
+def _served():
+    return model_store.serving_model()[0]
+
+
+# (page, stage, function), run in this order so each stage reuses the cached results of the previous ones
+STAGES = [
+    ("Accueil", 'import', _import('sections.accueil')),
+    ("Accueil", 'load', _accueil_load),
+    ("Accueil", 'cube', lambda nea, phl: derived.discovery_cube(nea)),
+    ("Accueil", 'decades', lambda nea, phl: derived.decade_discoveries(nea)),
+    ("Accueil", 'figures', lambda nea, phl: figures.decades(nea)),
+    ("Observer les Exoplanètes", 'import', _import('sections.observer')),
+    ("Observer les Exoplanètes", 'load', _observer_load),
+    ("Observer les Exoplanètes", 'pivot', lambda nea, phl: derived.discovery_pivot(nea)),
+    ("Observer les Exoplanètes", 'telescopes', lambda nea, phl: derived.telescope_frame(nea)),
+    ("Observer les Exoplanètes", 'scatter', lambda nea, phl: figures.methods(nea)),
+    ("Observer les Exoplanètes", 'figures', lambda nea, phl: [figures.discoveries(nea), figures.telescopes(nea)]),
+    ("Les Exoplanètes habitables", 'import', _import('sections.habitables')),
+    ("Les Exoplanètes habitables", 'merge', lambda nea, phl: derived.zone_frame(nea, phl)),
+    ("Les Exoplanètes habitables", 'aggregates', lambda nea, phl: derived.habitable_tables(nea, phl)),
+    ("Les Exoplanètes habitables", 'shares', _habitable_shares),
+    ("Les Exoplanètes habitables", 'index', lambda nea, phl: derived.zone_index(nea, phl)),
+    ("Les Exoplanètes habitables", 'zone', lambda nea, phl: derived.habitable_zone(nea, phl)),
+    ("Les Exoplanètes habitables", 'nearest', lambda nea, phl: derived.nearest_habitable(nea, phl, k=5)),
+    ("Les Exoplanètes habitables", 'figures', _habitable_figures),
+    ("L'IA à l'aide des Astrophysicien", 'import', _import('sections.ia')),
+    ("L'IA à l'aide des Astrophysicien", 'train', lambda nea, phl: model_store.reference_model()),
+    ("L'IA à l'aide des Astrophysicien", 'features', lambda nea, phl: derived.unlabelled_features(nea, _served())),
+    ("L'IA à l'aide des Astrophysicien", 'predict', lambda nea, phl: derived.prediction_table(nea, _served())),
+    ("L'IA à l'aide des Astrophysicien", 'explain', lambda nea, phl: derived.contributions(nea, _served())),
+    ("L'IA à l'aide des Astrophysicien", 'evaluation', lambda nea, phl: derived.evaluation(nea, _served())),
+]
+
+
+def make_fixture(scale, data_dir, source_dir=None):
+    # the catalogs repeated `scale` times, with unique planet names and ids
+    ids = data_store.read_ids(source_dir)
+    for name, key in data_store.NAME_COLS.items():
+        df = data_store.load(name, data_dir=source_dir)
+        copies = [df] + [df.assign(**{key: df[key] + f' #{i}'}) for i in range(1, scale)]
+        fixture = data_store.assign_ids(name, pd.concat(copies, ignore_index=True), ids)
+        version = f"{data_store.dataset_version(name, data_dir=source_dir)}x{scale}"
+        data_store.write_store(name, fixture, version, data_dir)
+    data_store.write_ids(ids, data_dir)
+
+
+@contextlib.contextmanager
+def isolated(data_dir, artifact_dir):
+    # points the stores at the fixture, with empty caches, and restores them afterwards
+    saved = data_store.DATA_DIR, aggregates.AGGREGATE_DIR, model_store.MODEL_DIR
+    data_store.DATA_DIR = data_dir
+    aggregates.AGGREGATE_DIR = os.path.join(artifact_dir, 'aggregates')
+    model_store.MODEL_DIR = os.path.join(artifact_dir, 'models')
+    cache.shared.clear()
+    model_store._loaded.clear()
+    model_store._serving = None
+    try:
+        yield
+    finally:
+        data_store.DATA_DIR, aggregates.AGGREGATE_DIR, model_store.MODEL_DIR = saved
+        cache.shared.clear()
+        model_store._loaded.clear()
+        model_store._serving = None
+
+
+def measure(func, *args):
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    arrow_before = pa.total_allocated_bytes()
+    start = time.perf_counter()
+    func(*args)
+    wall = time.perf_counter() - start
+    after, peak = tracemalloc.get_traced_memory()
+    return {'wall_s': round(wall, 4),
+            'peak_mb': round((peak - before) / 2**20, 2),
+            'retained_mb': round((after - before) / 2**20, 2),
+            'arrow_mb': round((pa.total_allocated_bytes() - arrow_before) / 2**20, 2)}
+
+
+def run(scales, source_dir=None):
+    results = []
+    tracemalloc.start()
+    try:
+        for scale in scales:
+            with tempfile.TemporaryDirectory(prefix=f'bench-{scale}x-') as tmp:
+                data_dir = os.path.join(tmp, 'data')
+                make_fixture(scale, data_dir, source_dir)
+                with isolated(data_dir, os.path.join(tmp, 'artifacts')):
+                    nea, phl = data_store.dataset_version('nea'), data_store.dataset_version('phl')
+                    rows = data_store.read_manifest()['nea']['rows']
+                    for page, stage, func in STAGES:
+                        result = dict(scale=scale, rows=rows, page=page, stage=stage, **measure(func, nea, phl))
+                        results.append(result)
+                        print(f"{scale:>4}x {page[:28]:<28} {stage:<11} {result['wall_s']:>9.3f}s "
+                              f"{result['peak_mb']:>9.1f} MB", file=sys.stderr)
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    # stages slower than the baseline by more than `tolerance` (and 10 ms)
+    reference = {(r['scale'], r['page'], r['stage']): r for r in baseline}
+    regressions = []
+    for r in results:
+        ref = reference.get((r['scale'], r['page'], r['stage']))
+        if ref and r['wall_s'] > ref['wall_s'] * (1 + tolerance) and r['wall_s'] - ref['wall_s'] > 0.01:
+            regressions.append(dict(r, baseline_s=ref['wall_s'], ratio=round(r['wall_s'] / ref['wall_s'], 2)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure le temps et la mémoire de chaque étape de l'application.")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help="facteurs de taille du catalogue")
+    parser.add_argument('--output', default='bench.json', help="fichier JSON des résultats")
+    parser.add_argument('--baseline', help="résultats de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="ralentissement toléré (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.scales)
+    with open(args.output, 'w') as f:
+        json.dump({'python': sys.version.split()[0], 'pandas': pd.__version__,
+                   'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['scale']}x {r['page']} / {r['stage']}: "
+                  f"{r['baseline_s']}s -> {r['wall_s']}s (x{r['ratio']})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
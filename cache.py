@@ -0,0 +1,135 @@
+"""In-process cache shared by every Streamlit session.
+
+Entries are keyed on the dataset version plus the parameters of the
+computation, expire after a TTL and are evicted least recently used first
+once the total size goes over the byte budget.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def nbytes(value, _seen=None):
+    # objects reached twice (shared arrays, cycles) are counted once
+    _seen = set() if _seen is None else _seen
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(nbytes(v, _seen) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(nbytes(k, _seen) + nbytes(v, _seen) for k, v in value.items())
+    if hasattr(value, 'to_plotly_json'):
+        # plotly figures: the size of their data and layout, not of their validators
+        return sys.getsizeof(value) + nbytes(value.to_plotly_json(), _seen)
+    if hasattr(value, '__dict__') and not isinstance(value, type):
+        # instances of the repo (ZoneIndex, ...): their arrays and frames
+        return sys.getsizeof(value) + nbytes(vars(value), _seen)
+    return sys.getsizeof(value)
+
+
+class SharedCache:
+
+    def __init__(self, max_bytes, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (value, size, expires)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, ttl=None):
+        size = nbytes(value)
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            # a value larger than the whole budget is returned but never kept
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size, expires)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute, ttl=None):
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # les autres sessions attendent le premier calcul au lieu de le refaire
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            value = self.put(key, compute(), ttl)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'expirations': self.expirations}
+
+
+# budget mémoire commun à toutes les sessions du processus
+shared = SharedCache(max_bytes=int(os.environ.get('EXOPLANET_CACHE_MB', 256)) * 2**20,
+                     ttl=int(os.environ.get('EXOPLANET_CACHE_TTL', 24 * 3600)))
+
+
+def cached(name, ttl=None, store=None):
+    # the first argument of the decorated function must be the dataset version,
+    # the other arguments are the parameters of the computation and must be hashable
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name,) + args + tuple(sorted(kwargs.items()))
+            return (store or shared).get_or_compute(key, lambda: func(*args, **kwargs), ttl)
+        return wrapper
+    return decorator
@@ -0,0 +1,59 @@
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+# au-delà de ce nombre de points par trace, le nuage est agrégé côté serveur
+MAX_POINTS = 5000
+# grid used by the aggregated mode, so the payload does not depend on the catalog size
+BINS = 150
+
+
+def clip(df, x, y, x_range=None, y_range=None):
+    # the points outside the axes are dropped before being sent to the browser
+    mask = df[x].notna() & df[y].notna()
+    if x_range is not None:
+        mask &= df[x].between(*x_range)
+    if y_range is not None:
+        mask &= df[y].between(*y_range)
+    return df[mask]
+
+
+def binned(df, x, y, x_range=None, y_range=None, bins=BINS):
+    # one point per occupied cell of the grid, placed at the cell mean with its count
+    x0, x1 = x_range if x_range is not None else (df[x].min(), df[x].max())
+    y0, y1 = y_range if y_range is not None else (df[y].min(), df[y].max())
+    ix = np.clip(((df[x] - x0) / ((x1 - x0) or 1) * bins).astype(int), 0, bins - 1)
+    iy = np.clip(((df[y] - y0) / ((y1 - y0) or 1) * bins).astype(int), 0, bins - 1)
+    cells = df.groupby([ix.values, iy.values]).agg(**{x: (x, 'mean'), y: (y, 'mean'), 'count': (x, 'size')})
+    return cells.reset_index(drop=True)
+
+
+def scatter_trace(df, x, y, name, text=None, marker=None, x_range=None, y_range=None,
+                  max_points=MAX_POINTS, bins=BINS):
+    df = clip(df, x, y, x_range, y_range)
+    marker = dict(marker or {})
+    if len(df) <= max_points:
+        return go.Scatter(x=df[x], y=df[y], text=df[text] if text else None,
+                          mode='markers', marker=marker, name=name)
+
+    cells = binned(df, x, y, x_range, y_range, bins)
+    marker['size'] = 4 + 10 * np.sqrt(cells['count'] / cells['count'].max())
+    return go.Scattergl(x=cells[x], y=cells[y], text=cells['count'].astype(str) + ' planètes',
+                        mode='markers', marker=marker, name=name)
+
+
+def scatter_figure(df, x, y, color, x_range=None, y_range=None, colors=px.colors.qualitative.Plotly,
+                   max_points=MAX_POINTS, bins=BINS):
+    # equivalent of px.scatter(color=...), one trace per category
+    fig = go.Figure()
+    groups = df.groupby(color, sort=False, observed=True) if color in df else [(None, df)]
+    for i, (value, group) in enumerate(groups):
+        fig.add_trace(scatter_trace(group, x, y, str(value), marker=dict(color=colors[i % len(colors)]),
+                                    x_range=x_range, y_range=y_range, max_points=max_points, bins=bins))
+    fig.update_layout(legend_title_text=color)
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
+    if y_range is not None:
+        fig.update_yaxes(range=list(y_range))
+    return fig
@@ -0,0 +1,243 @@
+"""Out-of-core training of the habitability classifier, for catalogs larger than memory.
+
+    python chunked_training.py synthetic/nea.parquet --chunk-rows 200000 --publish
+
+The catalog (Parquet, CSV or a Feather store of data_store.py) is read from
+disk in chunks, twice:
+
+1. a first pass learns the preprocessing of features.py (numerical columns,
+   category vocabularies, imputation means of the labelled planets) from
+   running sums and counts, without keeping the rows;
+2. the labelled rows are then encoded and imputed one chunk at a time by an
+   ``xgboost.DataIter``. XGBoost pages them into an on-disk cache
+   (external-memory DMatrix) and builds the trees with the multi-threaded
+   ``hist`` method.
+
+The memory used depends on the chunk size, not on the size of the catalog.
+The booster and its pipeline are saved in the model store like the models
+trained in memory, so the app and score.py can serve them. No held-out
+evaluation is saved with them (evaluation.py repeats the training in memory),
+the page says so instead of showing one.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+from collections import Counter
+
+import pandas as pd
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import xgboost as xgb
+
+import model_store
+import profiling
+from data_store import ID_COL
+from features import CATEGORICAL_COLS, TARGET, FeaturePipeline, numeric_columns
+
+
+# rows read from disk at a time
+CHUNK_ROWS = 100_000
+# boosting rounds, the number of trees of XGBClassifier
+NUM_ROUNDS = 100
+# pages of the external-memory DMatrix, removed once the model is saved
+CACHE_DIR = os.path.join(model_store.MODEL_DIR, 'cache')
+
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS, columns=None):
+    # frames of at most chunk_rows rows, with the requested columns that the file has
+    if path.endswith('.parquet'):
+        parquet = pq.ParquetFile(path)
+        if columns is not None:
+            columns = [c for c in parquet.schema_arrow.names if c in columns]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    elif path.endswith('.feather'):
+        # the stores are uncompressed, a memory mapped slice is only read when converted
+        table = feather.read_table(path, memory_map=True)
+        if columns is not None:
+            table = table.select([c for c in table.column_names if c in columns])
+        for start in range(0, table.num_rows, chunk_rows):
+            yield table.slice(start, chunk_rows).to_pandas()
+    else:
+        usecols = None if columns is None else (lambda c: c in columns)
+        yield from pd.read_csv(path, chunksize=chunk_rows, usecols=usecols)
+
+
+class RowsWriter:
+    # ids of the labelled planets written as they come, a JSON list like model_store._save_rows()
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w')
+        self.file.write('[')
+        self.first = True
+
+    def write(self, ids):
+        for row_id in ids:
+            self.file.write(('' if self.first else ',') + json.dumps(row_id))
+            self.first = False
+
+    def close(self):
+        if not self.file.closed:
+            self.file.write(']')
+            self.file.close()
+
+
+class Statistics:
+    # running statistics of the catalog, enough to build the FeaturePipeline
+    # that FeaturePipeline.fit would give on the whole catalog
+
+    def __init__(self, rows=None):
+        self.numeric_cols = None
+        self.sums = None
+        self.counts = None
+        # dicts keep the order of appearance, like vocabularies()
+        self.vocab = {col: {} for col in CATEGORICAL_COLS}
+        self.category_counts = {col: Counter() for col in CATEGORICAL_COLS}
+        self.labelled = 0
+        self.classes = set()
+        self.digest = hashlib.sha256()
+        # RowsWriter of the trained planets, to publish the model
+        self.rows = rows
+
+    def add(self, chunk):
+        if self.numeric_cols is None:
+            self.numeric_cols = [col for col in numeric_columns(chunk) if col not in (TARGET, ID_COL)]
+            self.sums = pd.Series(0.0, index=self.numeric_cols)
+            self.counts = pd.Series(0, index=self.numeric_cols)
+        for col in CATEGORICAL_COLS:
+            if col in chunk:
+                self.vocab[col].update(dict.fromkeys(chunk[col].dropna().unique().tolist()))
+
+        labelled = chunk[chunk[TARGET].notna()]
+        numeric = labelled.reindex(columns=self.numeric_cols)
+        self.sums += numeric.sum()
+        self.counts += numeric.count()
+        for col in CATEGORICAL_COLS:
+            if col in labelled:
+                self.category_counts[col].update(labelled[col].value_counts().to_dict())
+        self.labelled += len(labelled)
+        self.classes.update(labelled[TARGET].unique().tolist())
+        self.digest.update(pd.util.hash_pandas_object(labelled, index=False).values.tobytes())
+        if self.rows is not None and {'pl_name', 'disc_year'} <= set(labelled.columns):
+            self.rows.write(model_store.row_ids(labelled).tolist())
+
+    def pipeline(self):
+        if not self.labelled:
+            raise ValueError("no labelled planet in the catalog")
+        means = self.sums / self.counts
+        for col in CATEGORICAL_COLS:
+            # mean of the codes, the missing categories count as -1
+            codes = {value: i for i, value in enumerate(self.vocab[col])}
+            counts = self.category_counts[col]
+            missing = self.labelled - sum(counts.values())
+            means[col] = (sum(codes[value] * n for value, n in counts.items()) - missing) / self.labelled
+        return FeaturePipeline(self.numeric_cols, {col: list(v) for col, v in self.vocab.items()}, means.to_dict())
+
+    def key(self, params):
+        # content hash of the labelled rows plus the hyperparameters, like model_store.model_key
+        h = self.digest.copy()
+        h.update(json.dumps([str(c) for c in self.numeric_cols]).encode())
+        h.update(json.dumps(dict(params, chunked=True), sort_keys=True, default=str).encode())
+        return h.hexdigest()[:16]
+
+
+class LabelledChunks(xgb.DataIter):
+    # encoded and imputed labelled rows, read again from disk at each pass of XGBoost
+
+    def __init__(self, path, pipeline, chunk_rows, cache_prefix):
+        self.path = path
+        self.pipeline = pipeline
+        self.chunk_rows = chunk_rows
+        self.columns = set(pipeline.columns) | {TARGET}
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def reset(self):
+        self._chunks = None
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = iter_chunks(self.path, self.chunk_rows, self.columns)
+        for chunk in self._chunks:
+            labelled = chunk[chunk[TARGET].notna()]
+            if len(labelled):
+                input_data(data=self.pipeline.transform(labelled, impute=True),
+                           label=labelled[TARGET].to_numpy(dtype='float32'))
+                return 1
+        return 0
+
+
+def booster_params(params, classes):
+    # XGBClassifier hyperparameters for xgb.train, with the objective it would pick
+    params = dict(params)
+    params.pop('n_estimators', None)
+    if sorted(classes) != list(range(len(classes))):
+        raise ValueError(f"the classes must be 0..n-1, not {sorted(classes)}")
+    if len(classes) > 2:
+        params.update(objective='multi:softprob', num_class=len(classes))
+    else:
+        params.setdefault('objective', 'binary:logistic')
+    params.update(tree_method='hist')
+    params.setdefault('nthread', os.cpu_count())
+    return params
+
+
+def train(path, chunk_rows=CHUNK_ROWS, params=None, publish=False):
+    # returns the key of the model trained on the labelled planets of `path`
+    params = model_store.DEFAULT_PARAMS if params is None else params
+    os.makedirs(model_store.MODEL_DIR, exist_ok=True)
+    # the ids go to disk chunk by chunk, they are renamed once the key of the model is known
+    rows = RowsWriter(os.path.join(model_store.MODEL_DIR, f'rows.{os.getpid()}.tmp')) if publish else None
+    try:
+        stats = Statistics(rows)
+        with profiling.stage('statistiques par blocs'):
+            for chunk in iter_chunks(path, chunk_rows):
+                stats.add(chunk)
+        pipeline = stats.pipeline()
+        key = stats.key(params)
+
+        if not os.path.exists(model_store.model_path(key)):
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            prefix = os.path.join(CACHE_DIR, key)
+            dtrain = None
+            try:
+                with profiling.stage('xgb.train external memory'):
+                    dtrain = xgb.DMatrix(LabelledChunks(path, pipeline, chunk_rows, prefix))
+                    booster = xgb.train(booster_params(params, stats.classes), dtrain,
+                                        num_boost_round=params.get('n_estimators', NUM_ROUNDS))
+                model_store.save_model(booster, key)
+            finally:
+                # the DMatrix holds its pages open, it is released before they are removed
+                del dtrain
+                for file in glob.glob(f'{prefix}*'):
+                    os.remove(file)
+        model_store.save_pipeline(pipeline, key)
+
+        if rows is not None:
+            rows.close()
+            os.replace(rows.path, model_store.rows_path(key))
+            model_store.publish(key)
+    finally:
+        if rows is not None:
+            rows.close()
+            if os.path.exists(rows.path):
+                os.remove(rows.path)
+    return key
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entraine le modèle d'habitabilité par blocs, sans charger le catalogue en mémoire.")
+    parser.add_argument('source', help="fichier Parquet, CSV ou Feather des planètes")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="lignes lues à la fois")
+    parser.add_argument('--publish', action='store_true', help="sert le modèle entrainé dans l'application")
+    args = parser.parse_args(argv)
+
+    key = train(args.source, args.chunk_rows, publish=args.publish)
+    print(f'modèle entrainé : {key}')
+
+
+if __name__ == '__main__':
+    main()
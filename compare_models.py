@@ -0,0 +1,160 @@
+"""Comparison of the classifiers tested for the habitability model.
+
+    python compare_models.py --folds 5
+
+Each (model, fold) cell is evaluated in a process pool and saved on disk
+under the hash of the training data, so adding a model or a new version of
+the catalog only evaluates the missing cells. The mean scores are written
+to the table read by the "Explication du modèle retenu" expander.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import AdaBoostClassifier, BaggingClassifier, RandomForestClassifier
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
+from xgboost import XGBClassifier
+
+import data_store
+import model_store
+from features import TARGET, FeaturePipeline
+
+
+SCORE_DIR = os.path.join(data_store.ARTIFACT_DIR, 'scores')
+LATEST = 'latest.json'
+
+# modèles comparés, avec leurs hyperparamètres
+MODELS = {
+    'SGDClassifier': SGDClassifier(random_state=50),
+    'DecisionTreeClassifier': DecisionTreeClassifier(random_state=50),
+    'KNeighborsClassifier': KNeighborsClassifier(),
+    'BaggingClassifier': BaggingClassifier(random_state=50),
+    'RandomForestClassifier': RandomForestClassifier(random_state=50),
+    'AdaBoostClassifier': AdaBoostClassifier(random_state=50),
+    'XGBoost': XGBClassifier(**model_store.DEFAULT_PARAMS),
+}
+
+# training data of each worker, sent once by _init_worker
+_worker = {}
+
+
+def training_set(planets):
+    # same rows and preprocessing as the model of the app
+    pipeline = FeaturePipeline.fit(planets)
+    X, y, _ = pipeline.split(pipeline.transform(planets).join(planets[TARGET]))
+    return X, y.astype('int64')
+
+
+def _params_key(estimator):
+    params = json.dumps(estimator.get_params(), sort_keys=True, default=str)
+    return hashlib.sha256(params.encode()).hexdigest()[:8]
+
+
+def cell_path(data_key, name, estimator, fold, folds, seed):
+    return os.path.join(SCORE_DIR, 'cells', data_key,
+                        f'{name}-{_params_key(estimator)}-{folds}f{seed}-{fold}.json')
+
+
+def _init_worker(X, y):
+    _worker['X'], _worker['y'] = X, y
+
+
+def _evaluate(estimator, train_idx, test_idx):
+    X, y = _worker['X'], _worker['y']
+    start = time.perf_counter()
+    model = clone(estimator).fit(X[train_idx], y[train_idx])
+    fit_s = time.perf_counter() - start
+    score = accuracy_score(y[test_idx], model.predict(X[test_idx]))
+    return {'score': float(score), 'fit_s': round(fit_s, 4)}
+
+
+def _read(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def run(X, y, models=None, folds=5, seed=50, workers=None):
+    models = MODELS if models is None else models
+    data_key = model_store.model_key(X, y)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(X, y))
+
+    cells = {}
+    todo = []
+    for name, estimator in models.items():
+        for fold in range(folds):
+            path = cell_path(data_key, name, estimator, fold, folds, seed)
+            cell = _read(path)
+            if cell is None:
+                todo.append((name, estimator, fold, path))
+            else:
+                cells[name, fold] = cell
+
+    if todo:
+        # only the missing cells are evaluated, on every core.
+        # the columns left empty after imputation are set to 0 for the sklearn models
+        X_values = X.fillna(0).to_numpy(dtype='float64')
+        y_values = y.to_numpy()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(X_values, y_values)) as pool:
+            futures = {pool.submit(_evaluate, estimator, *splits[fold]): (name, fold, path)
+                       for name, estimator, fold, path in todo}
+            for future in as_completed(futures):
+                name, fold, path = futures[future]
+                cells[name, fold] = future.result()
+                _write(path, cells[name, fold])
+
+    table = pd.DataFrame([dict(Test=name, fold=fold, **cell) for (name, fold), cell in cells.items()])
+    table = (table.groupby('Test', sort=False)
+             .agg(Score=('score', 'mean'), Ecart=('score', 'std'), Entrainement=('fit_s', 'mean'))
+             .reset_index())
+    table = table.set_index('Test').loc[list(models)].reset_index()
+
+    result = {'data_key': data_key, 'folds': folds, 'seed': seed, 'evaluated': len(todo),
+              'table': table.to_dict('list')}
+    _write(os.path.join(SCORE_DIR, f'{data_key}.json'), result)
+    _write(os.path.join(SCORE_DIR, LATEST), result)
+    return table, len(todo)
+
+
+def read_table():
+    # last score table written by run(), None if the comparison has never been run
+    result = _read(os.path.join(SCORE_DIR, LATEST))
+    return None if result is None else pd.DataFrame(result['table'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare les modèles de classification par validation croisée.")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=None, help="nombre de processus (tous les coeurs par défaut)")
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), help="modèles à comparer (tous par défaut)")
+    args = parser.parse_args(argv)
+
+    models = {name: MODELS[name] for name in args.models} if args.models else None
+    X, y = training_set(data_store.load('nea'))
+    table, evaluated = run(X, y, models, args.folds, args.seed, args.workers)
+    print(f'{evaluated} cellules évaluées')
+    print(table.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""Local columnar copy of the NEA and PHL catalogs.
+
+Run ``python data_store.py`` once (or after each catalog update) to download
+the two CSV files and store them as uncompressed Feather files in ``data/``.
+The app then reads them memory-mapped, column by column, without network.
+
+Each version is written to its own file and published by replacing the
+manifest, so readers see either the previous version or the new one
+(see refresher.py for the background updates).
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+try:
+    import fcntl
+except ImportError:  # Windows: the lock only holds between the threads of a process
+    fcntl = None
+
+
+# modifier selon la localisation de la BD
+SOURCES = {
+    'nea': 'https://raw.githubusercontent.com/MickaelKohler/Exoplanet_Discovery/main/planets.csv',
+    'phl': 'http://www.hpcf.upr.edu/~abel/phl/hec2/database/phl_exoplanet_catalog.csv',
+}
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get('EXOPLANET_DATA', os.path.join(ROOT_DIR, 'data'))
+# fichiers produits à partir des données : modèles, agrégats...
+ARTIFACT_DIR = os.environ.get('EXOPLANET_ARTIFACTS', os.path.join(ROOT_DIR, 'artifacts'))
+MANIFEST = 'manifest.json'
+# verrou des publications, partagé par les processus (workers Streamlit, CLI)
+LOCK_FILE = '.publish.lock'
+# identifiants des planètes, communs aux deux catalogues
+PLANET_IDS = 'planet_ids.json'
+ID_COL = 'planet_id'
+NAME_COLS = {'nea': 'pl_name', 'phl': 'P_NAME'}
+
+# explicit dtypes of the columns used by the app, the others keep the type found by pandas.
+# the low-cardinality text columns are stored as categories
+DTYPES = {
+    'nea': {'pl_name': str, 'hostname': str, 'pl_letter': 'category', 'discoverymethod': 'category',
+            'disc_locale': 'category', 'disc_facility': 'category', 'disc_telescope': 'category',
+            'S_CONSTELLATION': 'category',
+            'disc_year': 'int64', 'sy_dist': 'float64', 'sy_disterr1': 'float64',
+            'pl_orbper': 'float64', 'P_HABITABLE': 'float64'},
+    'phl': {'P_NAME': str, 'S_TYPE_TEMP': 'category', 'P_TYPE': 'category', 'S_AGE': 'float64',
+            'P_DISTANCE': 'float64', 'S_TEMPERATURE': 'float64', 'P_HABITABLE': 'float64'},
+}
+
+# Groupe les objectifs photos et groupes les telescopes, tous les autres sont des "Telescope"
+TELESCOPE_GROUPS = {'Canon 400mm f/2.8L': 'Objectif photo',
+                    'Mamiya 645 80mm f/1.9': 'Objectif photo',
+                    'Canon 200mm f/1.8L': 'Objectif photo',
+                    '0.95 m Kepler Telescope': '0.95 m Kepler Telescope'}
+TELESCOPE_CATEGORIES = ['0.95 m Kepler Telescope', 'Objectif photo', 'Telescope']
+
+_manifest_lock = threading.RLock()
+_held = threading.local()
+
+
+def store_path(name, data_dir=None):
+    # file of the published version, named after it
+    entry = read_manifest(data_dir).get(name, {})
+    return os.path.join(data_dir or DATA_DIR, entry.get('file', f'{name}.feather'))
+
+
+@contextlib.contextmanager
+def _store_lock(data_dir=None):
+    # the manifest and the ids are read, modified and written back: one publication at a time,
+    # between the threads of the process (RLock) and between the processes (flock)
+    with _manifest_lock:
+        depth = getattr(_held, 'depth', 0)
+        _held.depth = depth + 1
+        try:
+            if depth or fcntl is None:
+                yield
+            else:
+                data_dir = data_dir or DATA_DIR
+                os.makedirs(data_dir, exist_ok=True)
+                with open(os.path.join(data_dir, LOCK_FILE), 'w') as f:
+                    # released when the file is closed
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    yield
+        finally:
+            _held.depth = depth
+
+
+def read_manifest(data_dir=None):
+    path = os.path.join(data_dir or DATA_DIR, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(manifest, data_dir):
+    path = os.path.join(data_dir, MANIFEST)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def sources(data_dir=None):
+    # source of each catalog: the one it was ingested from, the default URL otherwise
+    manifest = read_manifest(data_dir)
+    return {name: manifest.get(name, {}).get('source') or default for name, default in SOURCES.items()}
+
+
+def fetch(source, validators=None):
+    # returns (raw, validators), raw is None when the source has not changed since `validators`:
+    # ETag / Last-Modified for a URL, modification time and size for a local file
+    validators = validators or {}
+    if os.path.exists(source):
+        stat = os.stat(source)
+        current = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        if validators == current:
+            return None, validators
+        with open(source, 'rb') as f:
+            return f.read(), current
+
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    try:
+        with urllib.request.urlopen(urllib.request.Request(source, headers=headers), timeout=60) as response:
+            return response.read(), {'etag': response.headers.get('ETag'),
+                                     'last_modified': response.headers.get('Last-Modified')}
+    except urllib.error.HTTPError as error:
+        if error.code == 304:
+            return None, validators
+        raise
+
+
+def telescope_groups(telescopes):
+    # the lookup is done once per distinct telescope, not once per planet
+    telescopes = telescopes.astype('category')
+    groups = pd.Series(telescopes.cat.categories).map(TELESCOPE_GROUPS).fillna('Telescope')
+    # code -1 (no telescope) takes the last entry
+    labels = np.append(groups.values, 'Telescope')[telescopes.cat.codes.values]
+    return pd.Categorical(labels, categories=TELESCOPE_CATEGORIES)
+
+
+def name_key(names):
+    # "Kepler-22 b", "kepler 22b" and "KEPLER-22_B" are the same planet
+    return names.astype(str).str.casefold().str.replace(r'[\s_\-]+', '', regex=True)
+
+
+def read_ids(data_dir=None):
+    path = os.path.join(data_dir or DATA_DIR, PLANET_IDS)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_ids(ids, data_dir=None):
+    data_dir = data_dir or DATA_DIR
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, PLANET_IDS)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(ids, f)
+    os.replace(tmp, path)
+
+
+def assign_ids(name, df, ids):
+    # new names get the next free ids, so the id of a planet never changes between versions
+    keys = name_key(df[NAME_COLS[name]])
+    for key in keys.drop_duplicates():
+        if key not in ids:
+            ids[key] = len(ids)
+    df[ID_COL] = keys.map(ids).astype('int64')
+    return df
+
+
+def normalize(name, df, ids=None):
+    if name == 'nea' and 'disc_telescope' in df:
+        df['telescope_group'] = telescope_groups(df['disc_telescope'])
+    if ids is not None and NAME_COLS[name] in df:
+        df = assign_ids(name, df, ids)
+    return df
+
+
+def parse_csv(name, raw, columns=None, ids=None):
+    dtypes = DTYPES.get(name, {})
+    header = pd.read_csv(io.BytesIO(raw), nrows=0).columns
+    usecols = None
+    if columns is not None:
+        # derived columns are computed from their source column
+        usecols = [c for c in columns if c in header]
+        if 'telescope_group' in columns:
+            usecols.append('disc_telescope')
+        if ID_COL in columns and NAME_COLS[name] not in usecols:
+            usecols.append(NAME_COLS[name])
+    df = pd.read_csv(io.BytesIO(raw), usecols=usecols,
+                     dtype={c: t for c, t in dtypes.items() if c in header})
+    df = normalize(name, df, ids)
+    return df[list(columns)] if columns is not None else df
+
+
+def _remove_old_files(name, keep, data_dir):
+    # the previous version is kept for the reruns that are still reading it
+    for file in os.listdir(data_dir):
+        if file.startswith(f'{name}-') and file.endswith('.feather') and file not in keep:
+            try:
+                os.remove(os.path.join(data_dir, file))
+            except OSError:
+                pass
+
+
+def write_store(name, df, version, data_dir=None, **meta):
+    data_dir = data_dir or DATA_DIR
+    os.makedirs(data_dir, exist_ok=True)
+    file = f'{name}-{version}.feather'
+    path = os.path.join(data_dir, file)
+    # uncompressed so the file can be memory-mapped
+    tmp = f'{path}.tmp'
+    feather.write_feather(df.reset_index(drop=True), tmp, compression='uncompressed')
+    os.replace(tmp, path)
+
+    # the new version is published by the replacement of the manifest
+    with _store_lock(data_dir):
+        manifest = read_manifest(data_dir)
+        previous = manifest.get(name, {}).get('file')
+        manifest[name] = {'version': version,
+                          'file': file,
+                          'rows': len(df),
+                          'dtypes': {c: str(t) for c, t in df.dtypes.items()},
+                          **meta}
+        _write_manifest(manifest, data_dir)
+    _remove_old_files(name, {file, previous}, data_dir)
+    return path
+
+
+def _publish(name, raw, data_dir=None, **meta):
+    # the names are matched once here, the app then joins the catalogs on planet_id;
+    # the ids are read and written back under the lock, so two publications never give one id twice
+    with _store_lock(data_dir):
+        ids = read_ids(data_dir)
+        df = parse_csv(name, raw, ids=ids)
+        version = hashlib.sha256(raw).hexdigest()[:16]
+        write_ids(ids, data_dir)
+        write_store(name, df, version, data_dir, **meta)
+    return df, version
+
+
+def ingest(name, source=None, data_dir=None):
+    source = source or SOURCES[name]
+    raw, validators = fetch(source)
+    return _publish(name, raw, data_dir, source=source, validators=validators)
+
+
+def refresh(name, source=None, data_dir=None):
+    # conditional ingestion: returns the new version, or None when the source has not changed
+    source = source or SOURCES[name]
+    entry = read_manifest(data_dir).get(name, {})
+    raw, validators = fetch(source, entry.get('validators') if entry.get('source') == source else None)
+    if raw is None:
+        return None
+    if hashlib.sha256(raw).hexdigest()[:16] == entry.get('version'):
+        # same content under new validators (touched file, new ETag...)
+        with _store_lock(data_dir):
+            manifest = read_manifest(data_dir)
+            manifest[name].update(source=source, validators=validators)
+            _write_manifest(manifest, data_dir or DATA_DIR)
+        return None
+    return _publish(name, raw, data_dir, source=source, validators=validators)[1]
+
+
+def version_path(name, version=None, data_dir=None):
+    # file of a given version, the published one when version is None or 'remote'
+    # (asked before the first ingestion); None when there is no local copy yet
+    entry = read_manifest(data_dir).get(name, {})
+    if version in (None, 'remote') or version == entry.get('version'):
+        path = store_path(name, data_dir)
+        return path if os.path.exists(path) else None
+    path = os.path.join(data_dir or DATA_DIR, f'{name}-{version}.feather')
+    if not os.path.exists(path):
+        # only the published version and the previous one are kept (see _remove_old_files)
+        raise FileNotFoundError(f"version {version} of {name} is no longer stored")
+    return path
+
+
+def _ingest_once(name, data_dir=None):
+    # the first load without a local copy downloads the source and stores it,
+    # the sessions that wait on the lock then read the stored file
+    with _store_lock(data_dir):
+        path = version_path(name, None, data_dir)
+        if path is None:
+            ingest(name, sources(data_dir)[name], data_dir)
+            path = store_path(name, data_dir)
+    return path
+
+
+def load(name, columns=None, data_dir=None, version=None):
+    # only the requested columns are read from the memory-mapped file.
+    # `version` is the one the caller got from dataset_version(): the data then matches the
+    # version its results are cached under, even if another one is published in between
+    path = version_path(name, version, data_dir)
+    columns = list(columns) if columns is not None else None
+    if path is None:
+        # pas encore de copie locale : téléchargée une seule fois, pas à chaque chargement
+        path = _ingest_once(name, data_dir)
+    # one block per column: the numeric columns without missing values stay read-only
+    # views on the mapped file instead of being copied into consolidated blocks
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas(split_blocks=True)
+
+
+def stored_columns(name, data_dir=None, version=None):
+    # columns of the local copy, None when there is none yet
+    path = version_path(name, version, data_dir)
+    return None if path is None else feather.read_table(path, memory_map=True).column_names
+
+
+def dataset_version(*names, data_dir=None):
+    manifest = read_manifest(data_dir)
+    names = names or tuple(sorted(SOURCES))
+    return '-'.join(manifest.get(name, {}).get('version', 'remote') for name in names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Télécharge les catalogues NEA et PHL dans le stockage local.")
+    parser.add_argument('--nea', default=SOURCES['nea'], help="URL ou fichier CSV de la NASA Exoplanet Archive")
+    parser.add_argument('--phl', default=SOURCES['phl'], help="URL ou fichier CSV du Planetary Habitability Laboratory")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    for name in ('nea', 'phl'):
+        df, version = ingest(name, getattr(args, name), args.data_dir)
+        print(f'{name}: {len(df)} lignes, {df.shape[1]} colonnes, version {version}')
+
+    # the derived tables are rebuilt (or updated) for the new dataset version
+    import aggregates
+    tables = aggregates.load_tables(args.data_dir)
+    print(f"agrégats {tables['version']} : {tables['rows']} planètes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""Frames derived from the catalogs, computed once per dataset version.
+
+Every function goes through the shared cache (see cache.py), so all the
+sessions of a worker reuse the same frames. They must not be modified in place.
+The frames of the IA page import the ML stack (model_store, xgboost) when they
+are first computed, so the other pages never load it.
+"""
+import numpy as np
+import pandas as pd
+
+import aggregates
+import data_store
+import discovery_stats
+import features
+from cache import cached
+from profiling import timed
+from zone_index import ZoneIndex
+
+
+# colonnes utilisées par chaque page
+ACCUEIL_COLS = discovery_stats.DIMENSIONS
+OBSERVER_COLS = ('pl_name', 'disc_year', 'discoverymethod', 'sy_disterr1', 'pl_orbper')
+
+
+@timed('discovery_cube')
+@cached('discovery_cube')
+def discovery_cube(nea_version):
+    return discovery_stats.build_cube(data_store.load('nea', ACCUEIL_COLS, version=nea_version))
+
+
+@timed('decad_disc')
+@cached('decad_disc')
+def decade_discoveries(nea_version):
+    decades = discovery_stats.counts(discovery_cube(nea_version), width=10)
+    decad_disc = decades.to_frame('Découvertes')
+    # no growth for the first decade
+    decad_disc['Augmentation'] = discovery_stats.growth(decades).astype(object).fillna('')
+    return decad_disc
+
+
+@timed('planets2')
+@cached('planets2')
+def telescope_frame(nea_version):
+    # telescopes are grouped at load time (see data_store.TELESCOPE_GROUPS)
+    planets2 = data_store.load('nea', ('telescope_group', 'discoverymethod'), version=nea_version)
+    return planets2.rename(columns={'telescope_group': 'disc_telescope'})
+
+
+@timed('df_hist')
+@cached('df_hist')
+def discovery_pivot(nea_version):
+    return discovery_stats.pivot(discovery_cube(nea_version))
+
+
+@timed('zone_hab')
+@cached('zone_hab')
+def zone_frame(nea_version, phl_version):
+    return aggregates.merge_zone(data_store.load('nea', aggregates.PLANET_COLS, version=nea_version),
+                                 data_store.load('phl', aggregates.PHL_COLS, version=phl_version))
+
+
+@timed('habitable_tables')
+@cached('habitable_tables')
+def habitable_tables(nea_version, phl_version):
+    # the merge is only done when the precomputed tables are missing or outdated
+    return aggregates.materialize(nea_version, phl_version, lambda: zone_frame(nea_version, phl_version))
+
+
+@timed('zone_index')
+@cached('zone_index')
+def zone_index(nea_version, phl_version):
+    return ZoneIndex(zone_frame(nea_version, phl_version))
+
+
+# limites de la zone habitable du graphique d'origine (bornes exclues)
+ZONE_DISTANCE = (None, 2)
+ZONE_TEMPERATURE = (2500, 8000)
+
+
+@timed('clean_zone')
+def habitable_zone(nea_version, phl_version, distance=ZONE_DISTANCE, temperature=ZONE_TEMPERATURE):
+    # not cached: the query on the index is cheaper than a cache entry per position of the sliders
+    index = zone_index(nea_version, phl_version)
+    rows = index.query(P_DISTANCE=distance, S_TEMPERATURE=temperature)
+    clean_zone = index.take(rows, ['pl_name', 'P_DISTANCE', 'S_TEMPERATURE', 'P_HABITABLE'])
+    # unlabelled planets are shown as habitable, as on the original chart
+    clean_zone['P_HABITABLE'] = np.where(clean_zone['P_HABITABLE'] != 0, 'Habitable', 'Non Habitable')
+    return clean_zone
+
+
+@timed('nearest_habitable')
+def nearest_habitable(nea_version, phl_version, k=1):
+    # habitable planets closest to the Earth, with their distance in parsecs
+    index = zone_index(nea_version, phl_version)
+    rows = index.nearest('sy_dist', k, where=index.habitable)
+    return index.take(rows, ['pl_name', 'hostname', 'sy_dist'])
+
+
+@timed('df_exoplanet_rf_2')
+@cached('df_exoplanet_rf_2')
+def unlabelled_features(nea_version, model_key):
+    # features of the planets without PHL label only, encoded with the preprocessing saved with the model.
+    # only the columns of the model are read, the index keeps the positions in the store
+    import model_store
+    pipeline = model_store.load_pipeline(model_key)
+    stored = data_store.stored_columns('nea', version=nea_version)
+    columns = [c for c in pipeline.columns + [features.TARGET] if stored is None or c in stored]
+    df_exoplanet_vf = data_store.load('nea', columns, version=nea_version)
+    rows = np.flatnonzero(df_exoplanet_vf[features.TARGET].isna().to_numpy())
+    return pipeline.transform(df_exoplanet_vf.iloc[rows])
+
+
+@timed('appended_rows')
+@cached('appended_rows')
+def appended_rows(nea_version, model_key):
+    import model_store
+    planets = data_store.load('nea', ('pl_name', 'disc_year', features.TARGET), version=nea_version)
+    return len(model_store.appended_rows(planets, model_key))
+
+
+@timed('df_final')
+@cached('df_final')
+def prediction_table(nea_version, model_key, hidden=False):
+    if hidden:
+        # the same table with the predictions blanked, shared by the sessions until the button is clicked
+        return prediction_table(nea_version, model_key).assign(**{'Prédiction': ' '})
+
+    import model_store
+    model = model_store.load_model(model_key)
+    df_exoplanet_rf_2 = unlabelled_features(nea_version, model_key)
+
+    # making prediction on unknown dataset.
+    # both frames are read from the same version of the store, so the rows are taken by position
+    df_test = data_store.load('nea', ('pl_name', 'disc_year', 'discoverymethod'), version=nea_version)
+    df_final = df_test.take(df_exoplanet_rf_2.index)
+    predictions = model.predict(df_exoplanet_rf_2)
+    df_final['predictions'] = np.where(predictions == 0, 'Inhabitable', predictions.astype(object))
+
+    df_final.columns = ["Nom de l'Exoplanète", 'Découverte', 'Méthode utilisée', 'Prédiction']
+    return df_final
+
+
+@timed('contributions')
+@cached('contributions')
+def contributions(nea_version, model_key):
+    # contribution of each feature to the predicted class of every unlabelled planet (TreeSHAP of xgboost),
+    # in margin units: the sum of a row, bias included, is the margin of the predicted class
+    import model_store
+    import xgboost as xgb
+    model = model_store.load_model(model_key)
+    X = unlabelled_features(nea_version, model_key)
+
+    contribs = model.get_booster().predict(xgb.DMatrix(X), pred_contribs=True)
+    if contribs.ndim == 3:
+        # multi-class model: one set per class, only the one of the predicted class is kept
+        predicted = contribs.sum(axis=2).argmax(axis=1)
+        contribs = contribs[np.arange(len(X)), predicted]
+
+    table = pd.DataFrame(contribs, columns=list(X.columns) + ['biais'], index=X.index)
+    table['pl_name'] = data_store.load('nea', ('pl_name',), version=nea_version)['pl_name'].to_numpy()[X.index]
+    return table
+
+
+@timed('importance')
+@cached('importance')
+def global_importance(nea_version, model_key):
+    # mean absolute contribution of each feature over the unlabelled planets
+    contribs = contributions(nea_version, model_key).drop(columns=['pl_name', 'biais'])
+    return contribs.abs().mean().sort_values(ascending=False).rename('Importance')
+
+
+@timed('évaluation')
+@cached('évaluation')
+def evaluation(nea_version, model_key):
+    # held-out report saved with the model, None for the models saved without one (trained by
+    # chunked_training.py): an evaluation computed here would not follow the procedure that built them
+    import model_store
+    return model_store.load_evaluation(model_key)
@@ -0,0 +1,50 @@
+"""Discovery counts by year, method and facility, and the statistics derived from them.
+
+The catalog is counted once into a small cube (one count per year, method
+and facility present). Yearly, 5-year, decade or custom periods and their
+growth rates are regroupings of that cube, for any number of periods.
+"""
+import numpy as np
+import pandas as pd
+
+
+DIMENSIONS = ('disc_year', 'discoverymethod', 'disc_facility')
+# regroupements proposés sur la page, en années
+PERIODS = {'Année': 1, '5 ans': 5, 'Décennie': 10}
+
+
+def build_cube(planets):
+    # the planets without facility are counted too
+    return planets.groupby(list(DIMENSIONS), observed=True, dropna=False).size().rename('count')
+
+
+def period_starts(years, width=1, edges=None):
+    # first year of the period of each year: periods of `width` years, or between custom edges
+    years = np.asarray(years)
+    if edges is not None:
+        edges = np.sort(np.asarray(edges))
+        return edges[np.clip(np.searchsorted(edges, years, side='right') - 1, 0, len(edges) - 1)]
+    return years // width * width
+
+
+def counts(cube, width=1, edges=None, by=None):
+    # discoveries per period, and per value of the `by` dimension if given
+    keys = [period_starts(cube.index.get_level_values('disc_year'), width, edges)]
+    names = ['disc_year']
+    if by is not None:
+        keys.append(cube.index.get_level_values(by))
+        names.append(by)
+    return cube.groupby(keys, observed=True).sum().rename_axis(names)
+
+
+def growth(period_counts):
+    # change from the previous period, in percents
+    return (period_counts.pct_change() * 100).round()
+
+
+def pivot(cube, by='discoverymethod', width=1):
+    # periods x values of `by`, with the totals of each row and column
+    table = counts(cube, width, by=by).unstack(fill_value=0)
+    table.columns = table.columns.astype(str)
+    table['All'] = table.sum(axis=1)
+    return pd.concat([table, table.sum().to_frame('All').T])
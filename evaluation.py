@@ -0,0 +1,105 @@
+"""Held-out evaluation of a habitability model, computed once per model version.
+
+The labelled planets are split like in the first version of the page
+(``train_test_split(..., random_state=50)``), stratified so the rare habitable
+planets are in both parts. The procedure that built the model (a fit from
+scratch, or a fit followed by continued boosting, see model_store.update) is
+repeated on the training part and scored on the held-out part: accuracy,
+precision and recall of the habitable planets, confusion matrix and
+calibration of the habitable probability. The prediction latency and the size
+are those of the served model. model_store saves the report next to the model
+(``<key>.eval.json``), the page only reads it.
+"""
+import os
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score, brier_score_loss, confusion_matrix, precision_score, recall_score
+from sklearn.model_selection import train_test_split
+from xgboost import XGBClassifier
+
+
+SEED = 50
+TEST_SIZE = 0.25
+# intervals of predicted probability of the calibration table
+CALIBRATION_BINS = 10
+# planets predicted one at a time for the latency of a single row
+LATENCY_ROWS = 100
+
+# procédures d'entrainement évaluées, affichées sur la page
+FROM_SCRATCH = "entrainement complet"
+CONTINUED = ("entrainement sur les planètes du modèle précédent, "
+             "puis {rounds} tours de boosting sur les planètes ajoutées")
+
+
+def split(X, y, seed=SEED, test_size=TEST_SIZE):
+    # stratified when every class has two planets at least
+    stratify = y if y.value_counts().min() >= 2 else None
+    return train_test_split(X, y, test_size=test_size, random_state=seed, stratify=stratify)
+
+
+def habitable_probability(model, X):
+    # every class but 0 (inhabitable) is a kind of habitable planet
+    return 1 - model.predict_proba(X)[:, 0]
+
+
+def calibration(habitable, probability, bins=CALIBRATION_BINS):
+    # observed share of habitable planets per interval of predicted probability
+    edges = np.linspace(0, 1, bins + 1)
+    which = np.clip(np.digitize(probability, edges[1:-1]), 0, bins - 1)
+    table = []
+    for b in range(bins):
+        in_bin = which == b
+        if in_bin.any():
+            table.append({'low': float(edges[b]), 'high': float(edges[b + 1]), 'count': int(in_bin.sum()),
+                          'predicted': float(probability[in_bin].mean()),
+                          'observed': float(habitable[in_bin].mean())})
+    return table
+
+
+def latency(model, X, rows=LATENCY_ROWS):
+    # microseconds per row of a batch prediction, milliseconds of a single row prediction (median)
+    start = time.perf_counter()
+    model.predict(X)
+    batch = time.perf_counter() - start
+    single = []
+    for i in range(min(rows, len(X))):
+        row = X.iloc[i:i + 1]
+        start = time.perf_counter()
+        model.predict(row)
+        single.append(time.perf_counter() - start)
+    return {'batch_us_per_row': round(batch / max(len(X), 1) * 1e6, 3),
+            'single_row_ms': round(float(np.median(single)) * 1e3, 3) if single else None}
+
+
+def report(model, X, y, params=None, path=None, seed=SEED, test_size=TEST_SIZE, build=None, procedure=FROM_SCRATCH):
+    # model: the served classifier, trained on all of (X, y); path: its saved artifact;
+    # build(X_train, y_train): the procedure that built it, a fit from scratch by default
+    X_train, X_test, y_train, y_test = split(X, y, seed, test_size)
+    if build is None:
+        held_out = XGBClassifier(**(params or {})).fit(X_train, y_train)
+    else:
+        held_out = build(X_train, y_train)
+    pred = held_out.predict(X_test)
+
+    habitable = (y_test.to_numpy() > 0).astype('int64')
+    pred_habitable = (pred > 0).astype('int64')
+    probability = habitable_probability(held_out, X_test)
+    labels = sorted(y.unique())
+    return {
+        'seed': seed,
+        'procedure': procedure,
+        'rows_train': len(X_train),
+        'rows_test': len(X_test),
+        'accuracy': float(accuracy_score(y_test, pred)),
+        'habitable': {'precision': float(precision_score(habitable, pred_habitable, zero_division=0)),
+                      'recall': float(recall_score(habitable, pred_habitable, zero_division=0)),
+                      'support': int(habitable.sum())},
+        'confusion': {'labels': [int(label) for label in labels],
+                      'matrix': confusion_matrix(y_test, pred, labels=labels).tolist()},
+        'brier': float(brier_score_loss(habitable, probability, pos_label=1)),
+        'calibration': calibration(habitable, probability),
+        'latency': latency(model, X_test),
+        'size': {'bytes': os.path.getsize(path) if path and os.path.exists(path) else None,
+                 'rounds': int(model.get_booster().num_boosted_rounds())},
+    }
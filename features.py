@@ -0,0 +1,99 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from data_store import ID_COL
+
+
+TARGET = 'P_HABITABLE'
+# main categorical columns, set into numerical value
+CATEGORICAL_COLS = ['pl_letter', 'discoverymethod', 'disc_locale']
+
+
+def numeric_columns(df):
+    # Selecting all numerical column from dataframe
+    return df.select_dtypes(include=np.number).columns.tolist()
+
+
+def vocabularies(df):
+    # categories in order of appearance, so the codes are the ones given by factorize()
+    return {col: df[col].dropna().unique().tolist() for col in CATEGORICAL_COLS}
+
+
+class FeaturePipeline:
+    # preprocessing of the habitability model, fitted once on the catalog:
+    # column order, category vocabularies and imputation means
+
+    def __init__(self, numeric_cols, vocab, means=None):
+        self.numeric_cols = list(numeric_cols)
+        self.vocab = {col: list(values) for col, values in vocab.items()}
+        self.means = pd.Series(means or {}, dtype='float64')
+        self._indexes = {col: pd.Index(values) for col, values in self.vocab.items()}
+        self._lookups = {col: {value: i for i, value in enumerate(values)} for col, values in self.vocab.items()}
+
+    @property
+    def columns(self):
+        return self.numeric_cols + CATEGORICAL_COLS
+
+    @classmethod
+    def fit(cls, df):
+        numeric_cols = [col for col in numeric_columns(df) if col not in (TARGET, ID_COL)]
+        pipeline = cls(numeric_cols, vocabularies(df))
+        # filling values are the means of the labelled planets
+        pipeline.means = pipeline.transform(df[df[TARGET].notna()]).mean()
+        return pipeline
+
+    def transform(self, df, impute=False):
+        # unknown or missing categories get the code -1, like factorize()
+        X = df.reindex(columns=self.numeric_cols)
+        for col in CATEGORICAL_COLS:
+            values = df[col] if col in df else pd.Series(np.nan, index=df.index)
+            X[col] = self._codes(col, values)
+        if impute:
+            X = X.fillna(self.means)
+        return X
+
+    def encode_record(self, record, out):
+        # one planet given as a dict, written into the float32 row `out` in the order of `columns`,
+        # without building a DataFrame: the same values as transform() for a single row
+        n = len(self.numeric_cols)
+        for j, col in enumerate(self.numeric_cols):
+            value = record.get(col)
+            out[j] = np.nan if value is None else float(value)
+        for k, col in enumerate(CATEGORICAL_COLS):
+            value = record.get(col)
+            out[n + k] = -1 if value is None else self._lookups[col].get(value, -1)
+        return out
+
+    def _codes(self, col, values):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # only the categories are looked up, then spread over the rows by their codes
+            lookup = np.append(self._indexes[col].get_indexer(values.cat.categories), -1)
+            return lookup[values.cat.codes.values].astype('int64')
+        return self._indexes[col].get_indexer(values).astype('int64')
+
+    def split(self, df_exoplanet_rf):
+        # ...splitting dataset on 'P_HABITABLE' none or not,
+        # only the labelled planets are filled with the mean of each column
+        labelled = df_exoplanet_rf[TARGET].notna()
+        X = df_exoplanet_rf.loc[labelled, self.columns].fillna(self.means)
+        y = df_exoplanet_rf.loc[labelled, TARGET]
+        return X, y, df_exoplanet_rf.loc[~labelled, self.columns]
+
+    def to_dict(self):
+        return {'numeric_cols': self.numeric_cols, 'vocab': self.vocab,
+                'means': {col: float(v) for col, v in self.means.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['numeric_cols'], data['vocab'], data['means'])
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,233 @@
+"""Plotly figures of the pages, built once per dataset version.
+
+Each function returns its ``go.Figure`` from the shared cache, so a rerun
+does not rebuild the figure and its layout. The figures are shared by the
+sessions and must not be modified. They are kept as Figure objects, not as
+JSON specs: ``st.plotly_chart`` re-validates a dict spec into a new Figure
+at every rerun (20-30 ms per figure, more than building the habitable zone
+figure), while a Figure is only serialized. That serialization is still paid
+at each rerun, it shows as the "st.plotly_chart" stages of the profiler.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import aggregates
+import charts
+import data_store
+import derived
+import discovery_stats
+from cache import cached
+from profiling import timed
+
+
+@timed('fig décennies')
+@cached('fig décennies')
+def decades(nea_version):
+    decad_disc = derived.decade_discoveries(nea_version)
+
+    fig = px.bar(decad_disc, x=decad_disc.index, y="Découvertes",
+                 title="Evolution du nombre d'exoplanètes découvertes",
+                 text='Augmentation',
+                 color_discrete_sequence=['darkblue']*len(decad_disc))
+    fig.update_traces(texttemplate='%{text:.2s}%')
+    fig.update_layout(showlegend=True, font_family='IBM Plex Sans', title_x=0.5,
+                      xaxis=dict(title="Pourcentage d'évolution d'une décénnie sur l'autre"),
+                      yaxis=dict(title="Nombre d'exoplanètes découvertes"),
+                      uniformtext_minsize=10, uniformtext_mode='hide',
+                      margin=dict(l=40, r=70, b=70, t=70),
+                      legend=dict(x=0, y=0.96, traceorder="normal",
+                                  bgcolor='rgba(0,0,0,0)',
+                                  font=dict(size=12)))
+    return fig
+
+
+@timed('fig découvertes')
+@cached('fig découvertes')
+def discoveries(nea_version, width=1):
+    # counts of the discovery cube, regrouped by periods of `width` years
+    tab = discovery_stats.counts(derived.discovery_cube(nea_version), width, by='discoverymethod').reset_index()
+
+    fig = px.bar(tab, x="disc_year", y="count", color="discoverymethod",
+                 title="<b>Le nombre de planètes découvertes par années et par méthodes</b>",
+                 color_discrete_sequence=px.colors.sequential.Agsunset_r,
+                 labels={'discoverymethod': "Méthode de découverte"})
+    fig.update_traces(width=width * 0.9)
+    fig.update_layout(xaxis_title="Années de découverte", yaxis_title="Nombre d'Exoplanet")
+    return fig
+
+
+@timed('fig méthodes')
+@cached('fig méthodes')
+def methods(nea_version):
+    # seuls les points visibles sont envoyés, agrégés s'ils sont trop nombreux
+    planets = data_store.load('nea', ('discoverymethod', 'sy_disterr1', 'pl_orbper'), version=nea_version)
+
+    fig = charts.scatter_figure(planets, x="sy_disterr1", y="pl_orbper", color='discoverymethod',
+                                x_range=(-2, 200), y_range=(0, 200))
+    fig.update_layout(title="<b>Les méthodes utilisées en fonction de la période orbitale et de la distance à la Terre</b>",
+                      xaxis_title="Distance à la Terre (al)", yaxis_title="Période orbitale autour de l'étoile")
+    return fig
+
+
+@timed('fig télescopes')
+@cached('fig télescopes')
+def telescopes(nea_version):
+    planets2 = derived.telescope_frame(nea_version)
+
+    fig = px.histogram(planets2, x="disc_telescope", color="discoverymethod",
+                       title="<b>Nombre de planètes détectées par type de téléscope</b>"
+                       ).update_xaxes(categoryorder="total descending")
+    fig.update_layout(xaxis_title="Type de telescope",
+                      yaxis_title="Nombre de planètes détéctées",
+                      title_text='Max température par Date en fonction des opinions', title_x=0.5)
+    return fig
+
+
+@timed('fig constellations')
+@cached('fig constellations')
+def constellations(nea_version, phl_version):
+    tables = derived.habitable_tables(nea_version, phl_version)
+    constelation = pd.DataFrame(tables['constellations'], columns=['S_CONSTELLATION', 'hostname', 'pl_name'])
+
+    fig = px.sunburst(constelation, path=['S_CONSTELLATION', 'hostname', 'pl_name'], maxdepth=2,
+                      color_discrete_sequence=px.colors.sequential.Peach_r)
+    fig.update_layout(title="<b>Où sont localisées les planètes habitables ?</b>",
+                      margin=dict(l=10, r=10, b=10, t=40))
+    return fig
+
+
+@timed('fig zone habitable')
+@cached('fig zone habitable')
+def habitable_zone(nea_version, phl_version, distance=derived.ZONE_DISTANCE, temperature=derived.ZONE_TEMPERATURE):
+    # one entry per position of the sliders, the default view is shared by every session
+    clean_zone = derived.habitable_zone(nea_version, phl_version, distance, temperature)
+    inHab = clean_zone[clean_zone['P_HABITABLE'] == 'Non Habitable']
+    hab = clean_zone[clean_zone['P_HABITABLE'] == 'Habitable']
+
+    fig = go.Figure()
+    fig.add_trace(
+        charts.scatter_trace(
+            inHab, x='P_DISTANCE', y='S_TEMPERATURE',
+            text='pl_name',
+            marker=dict(color='coral', opacity=0.3),
+            name='Non Habitable'
+        )
+    )
+    fig.add_trace(
+        charts.scatter_trace(
+            hab, x='P_DISTANCE', y='S_TEMPERATURE',
+            text='pl_name',
+            marker=dict(color='forestgreen'),
+            name='Habitable'
+        )
+    )
+    fig.update_layout(
+        title='<b>La situation des planètes habitables selon la chaleur du soleil et la distance</b>',
+        yaxis=dict(title="Température du soleil (en kelvins)"),
+        xaxis=dict(title="Distance planète/étoile (en année-lumière)"),
+        margin=dict(l=10, r=10, b=10, t=70))
+    return fig
+
+
+def _share_bar(tab, title, xaxis_title):
+    # grouped bars of the share of all the exoplanets and of the habitable ones
+    fig = px.bar(tab, x=tab.index, y=["Exoplanètes", "Habitables"], barmode='group', title=title,
+                 color_discrete_map={'Exoplanètes': 'deepskyblue', 'Habitables': 'coral'})
+    fig.update_traces(texttemplate='%{text}%', textposition='outside')
+    fig.update_layout(showlegend=True, font_family='IBM Plex Sans',
+                      xaxis=dict(title=xaxis_title),
+                      yaxis=dict(title=None),
+                      uniformtext_minsize=10, uniformtext_mode='hide',
+                      margin=dict(l=10, r=10, b=10),
+                      legend=dict(x=0, y=1, traceorder="normal", bgcolor='rgba(0,0,0,0)', font=dict(size=12)))
+    texts = [tab["Exoplanètes"], tab["Habitables"]]
+    for i, t in enumerate(texts):
+        fig.data[i].text = t
+    return fig
+
+
+@timed('fig types étoiles')
+@cached('fig types étoiles')
+def star_types(nea_version, phl_version):
+    tables = derived.habitable_tables(nea_version, phl_version)
+    return _share_bar(aggregates.share_table(tables, 'S_TYPE_TEMP', aggregates.STAR_TYPES),
+                      "<b>La répartition des exoplanètes selon le type de leur étoile</b> (en pourcents)",
+                      "Catégorie d'étoile")
+
+
+@timed('fig âge étoiles')
+@cached('fig âge étoiles')
+def star_ages(nea_version, phl_version):
+    tables = derived.habitable_tables(nea_version, phl_version)
+    return _share_bar(aggregates.share_table(tables, 'S_AGE', aggregates.AGE_LABELS, labels=aggregates.AGE_LABELS),
+                      "<b>La répartition des exoplanètes selon l'age de leur étoile</b> (en pourcents)",
+                      "Age de l'étoile (Gy)")
+
+
+@timed('fig types planètes')
+@cached('fig types planètes')
+def planet_types(nea_version, phl_version):
+    tables = derived.habitable_tables(nea_version, phl_version)
+    return _share_bar(aggregates.share_table(tables, 'P_TYPE', aggregates.PLANET_TYPES),
+                      "<b>La répartition des exoplanètes selon leur type</b> (en pourcents)",
+                      "Type d'exoplanète")
+
+
+@timed('fig importance')
+@cached('fig importance')
+def importance(nea_version, model_key, top=15):
+    tab = derived.global_importance(nea_version, model_key).head(top)[::-1]
+
+    fig = px.bar(tab, x='Importance', y=tab.index, orientation='h',
+                 title="<b>Les caractéristiques qui pèsent le plus dans les prédictions</b>",
+                 color_discrete_sequence=['darkblue'])
+    fig.update_layout(xaxis_title="Contribution moyenne (en valeur absolue)", yaxis_title=None,
+                      margin=dict(l=10, r=10, b=10, t=40))
+    return fig
+
+
+@timed('fig contributions')
+@cached('fig contributions')
+def planet_contributions(nea_version, model_key, planet, top=10):
+    contribs = derived.contributions(nea_version, model_key)
+    row = contribs[contribs['pl_name'] == planet].iloc[0].drop(['pl_name', 'biais']).astype('float64')
+    tab = row[row.abs().sort_values(ascending=False).index[:top]][::-1].rename('Contribution').to_frame()
+    tab['Sens'] = np.where(tab['Contribution'] > 0, 'Pour la prédiction', 'Contre la prédiction')
+
+    fig = px.bar(tab, x='Contribution', y=tab.index, color='Sens', orientation='h',
+                 title=f"<b>Ce qui explique la prédiction pour {planet}</b>",
+                 color_discrete_map={'Pour la prédiction': 'forestgreen', 'Contre la prédiction': 'coral'})
+    fig.update_layout(xaxis_title="Contribution à la prédiction", yaxis_title=None,
+                      margin=dict(l=10, r=10, b=10, t=40))
+    return fig
+
+
+@timed('fig confusion')
+@cached('fig confusion')
+def confusion(nea_version, model_key):
+    report = derived.evaluation(nea_version, model_key)
+    labels = [str(label) for label in report['confusion']['labels']]
+
+    fig = px.imshow(report['confusion']['matrix'], x=labels, y=labels, text_auto=True,
+                    color_continuous_scale='Blues',
+                    labels=dict(x="Classe prédite", y="Classe réelle", color="Planètes"),
+                    title="<b>Matrice de confusion sur les planètes mises de côté</b>")
+    fig.update_layout(margin=dict(l=10, r=10, b=10, t=40))
+    return fig
+
+
+@timed('fig calibration')
+@cached('fig calibration')
+def calibration(nea_version, model_key):
+    tab = pd.DataFrame(derived.evaluation(nea_version, model_key)['calibration'])
+
+    fig = px.line(tab, x='predicted', y='observed', markers=True, hover_data=['count'],
+                  title="<b>Probabilité prédite et part réelle de planètes habitables</b>",
+                  color_discrete_sequence=['darkblue'])
+    fig.add_trace(go.Scatter(x=[0, 1], y=[0, 1], mode='lines', name='Calibration parfaite',
+                             line=dict(color='grey', dash='dash')))
+    fig.update_layout(xaxis_title="Probabilité prédite d'être habitable", yaxis_title="Part de planètes habitables",
+                      margin=dict(l=10, r=10, b=10, t=40))
+    return fig
@@ -0,0 +1,377 @@
+"""Trained habitability models, keyed on their training data.
+
+The model served by the app is the one named in ``current.json``. When
+planets are appended to the catalog, ``update()`` continues boosting the
+served model on the new labelled rows (or retrains it from scratch) and then
+publishes the new model atomically. Sessions keep using the previous model
+until then. ``python model_store.py update`` runs an update from the shell.
+Each model trained here is saved with its held-out evaluation (see evaluation.py).
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import traceback
+from collections import OrderedDict
+
+import pandas as pd
+import xgboost as xgb
+from xgboost import XGBClassifier
+
+import data_store
+import evaluation
+import profiling
+from data_store import ARTIFACT_DIR
+from features import TARGET, FeaturePipeline
+
+
+MODEL_DIR = os.path.join(ARTIFACT_DIR, 'models')
+
+# hyperparameters of the habitability classifier (XGBoost defaults)
+DEFAULT_PARAMS = {}
+
+# number of fitted boosters kept in memory, shared by every session of the process
+LRU_SIZE = 4
+
+# boosting rounds added by an incremental update
+CONTINUE_ROUNDS = 20
+
+_loaded = OrderedDict()
+_lock = threading.Lock()
+_key_locks = {}
+
+# (key, model, pipeline) of the served model, replaced as a whole
+_serving = None
+_bootstrap_lock = threading.Lock()
+_update_lock = threading.Lock()
+# (catalog version, served key) -> error of the update that failed, it is not retried
+_update_failures = {}
+
+
+def model_key(X, y, params=None):
+    # content hash of the training frame plus the hyperparameters
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in X.columns]).encode())
+    h.update(pd.util.hash_pandas_object(X, index=True).values.tobytes())
+    h.update(pd.util.hash_pandas_object(y, index=True).values.tobytes())
+    h.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    return h.hexdigest()[:16]
+
+
+def model_path(key):
+    return os.path.join(MODEL_DIR, f'{key}.json')
+
+
+def pipeline_path(key):
+    return os.path.join(MODEL_DIR, f'{key}.pipeline.json')
+
+
+def evaluation_path(key):
+    return os.path.join(MODEL_DIR, f'{key}.eval.json')
+
+
+def _remember(key, model):
+    with _lock:
+        _loaded[key] = model
+        _loaded.move_to_end(key)
+        while len(_loaded) > LRU_SIZE:
+            _loaded.popitem(last=False)
+
+
+def _cached(key):
+    with _lock:
+        model = _loaded.get(key)
+        if model is not None:
+            _loaded.move_to_end(key)
+        return model
+
+
+def _key_lock(key):
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def save_model(model, key):
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    path = model_path(key)
+    # write then rename so a concurrent reader never sees a half written file,
+    # XGBoost picks the format from the extension: the temporary file must end in .json too
+    tmp = f'{os.path.splitext(path)[0]}.{os.getpid()}.tmp.json'
+    model.save_model(tmp)
+    try:
+        # the other processes only have the file, it must load before it is published
+        xgb.Booster(model_file=tmp)
+    except xgb.core.XGBoostError:
+        os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+    return path
+
+
+def save_pipeline(pipeline, key):
+    # the preprocessing is stored next to the model it was used to train
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    path = pipeline_path(key)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    pipeline.save(tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def load_pipeline(key):
+    path = pipeline_path(key)
+    if not os.path.exists(path):
+        return None
+    return FeaturePipeline.load(path)
+
+
+def save_evaluation(key, X, y, params=None, build=None, procedure=evaluation.FROM_SCRATCH):
+    # held-out report of the model `key`, written next to it;
+    # build(X_train, y_train) repeats on the training part the procedure that built the model
+    params = DEFAULT_PARAMS if params is None else params
+    with profiling.stage('évaluation'):
+        report = evaluation.report(load_model(key, params), X, y, params, model_path(key),
+                                   build=build, procedure=procedure)
+    path = evaluation_path(key)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(report, f)
+    os.replace(tmp, path)
+    return report
+
+
+def load_evaluation(key):
+    path = evaluation_path(key)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_model(key, params=None):
+    model = _cached(key)
+    if model is not None:
+        return model
+    path = model_path(key)
+    if not os.path.exists(path):
+        return None
+    model = XGBClassifier(**(params or {}))
+    model.load_model(path)
+    _remember(key, model)
+    return model
+
+
+def get_model(X, y, params=None, pipeline=None):
+    # returns the fitted classifier for (X, y, params), training it only once
+    params = DEFAULT_PARAMS if params is None else params
+    key = model_key(X, y, params)
+    model = load_model(key, params)
+    if model is not None:
+        return model
+
+    # only one session trains a given model, the others wait for it
+    with _key_lock(key):
+        model = load_model(key, params)
+        if model is None:
+            with profiling.stage('XGBClassifier.fit'):
+                model = XGBClassifier(**params).fit(X, y)
+            save_model(model, key)
+            _remember(key, model)
+            save_evaluation(key, X, y, params)
+        if pipeline is not None and not os.path.exists(pipeline_path(key)):
+            save_pipeline(pipeline, key)
+    return model
+
+
+
+def rows_path(key):
+    return os.path.join(MODEL_DIR, f'{key}.rows.json')
+
+
+def row_ids(planets):
+    # a planet is identified by its name and its discovery year
+    return planets['pl_name'].astype(str) + '|' + planets['disc_year'].astype(str)
+
+
+def _save_rows(key, ids):
+    path = rows_path(key)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(sorted(ids), f)
+    os.replace(tmp, path)
+
+
+def trained_rows(key):
+    path = rows_path(key)
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return set(json.load(f))
+
+
+def appended_rows(planets, key):
+    # labelled planets that the model `key` has not been trained on
+    labelled = planets[planets[TARGET].notna()]
+    return labelled[~row_ids(labelled).isin(trained_rows(key))]
+
+
+def current_path():
+    return os.path.join(MODEL_DIR, 'current.json')
+
+
+def publish(key, model=None, pipeline=None):
+    # the pointer file is replaced in one step, the other processes see the old or the new model
+    global _serving
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    path = current_path()
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'key': key}, f)
+    os.replace(tmp, path)
+    if model is not None and pipeline is not None:
+        _serving = (key, model, pipeline)
+    return serving_model()
+
+
+def serving_model():
+    global _serving
+    path = current_path()
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        key = json.load(f)['key']
+    serving = _serving
+    if serving is None or serving[0] != key:
+        serving = (key, load_model(key, DEFAULT_PARAMS), load_pipeline(key))
+        _serving = serving
+    return serving
+
+
+def reference_model():
+    # served model and its preprocessing, trained on the local catalog the first time
+    serving = serving_model()
+    if serving is not None:
+        return serving
+    with _bootstrap_lock:
+        serving = serving_model()
+        if serving is not None:
+            return serving
+        planets = data_store.load('nea')
+        pipeline = FeaturePipeline.fit(planets)
+        X, y, _ = pipeline.split(pipeline.transform(planets).join(planets[TARGET]))
+        model = get_model(X, y, pipeline=pipeline)
+        key = model_key(X, y, DEFAULT_PARAMS)
+        _save_rows(key, row_ids(planets[planets[TARGET].notna()]))
+        return publish(key, model, pipeline)
+
+
+def _continue_booster(model, X_new, y_new, rounds):
+    # more boosting rounds on (X_new, y_new), starting from the booster of `model`
+    # objective and number of classes are those of the saved booster, whatever the new labels
+    booster = model.get_booster()
+    learner = json.loads(booster.save_config())['learner']
+    params = dict(DEFAULT_PARAMS, objective=learner['objective']['name'])
+    num_class = int(learner['learner_model_param']['num_class'])
+    if num_class > 1:
+        params['num_class'] = num_class
+    with profiling.stage('xgb.train continue'):
+        return xgb.train(params, xgb.DMatrix(X_new, label=y_new), num_boost_round=rounds, xgb_model=booster)
+
+
+def _continue(key, model, pipeline, new, rounds):
+    # more boosting rounds on the appended planets, starting from the served booster
+    X_new = pipeline.transform(new, impute=True)
+    y_new = new[TARGET]
+    booster = _continue_booster(model, X_new, y_new, rounds)
+
+    h = hashlib.sha256(key.encode())
+    h.update(pd.util.hash_pandas_object(X_new, index=False).values.tobytes())
+    h.update(pd.util.hash_pandas_object(y_new, index=False).values.tobytes())
+    new_key = h.hexdigest()[:16]
+
+    save_model(booster, new_key)
+    save_pipeline(pipeline, new_key)
+    return new_key, load_model(new_key, DEFAULT_PARAMS)
+
+
+def _continued_build(planets, previous, rounds):
+    # the update on the training part: fit on the planets of the previous model, then continue on the appended ones
+    ids = row_ids(planets)
+
+    def build(X_train, y_train):
+        old = ids.loc[X_train.index].isin(previous).to_numpy()
+        model = XGBClassifier(**DEFAULT_PARAMS).fit(X_train[old], y_train[old])
+        if old.all():
+            return model
+        booster = _continue_booster(model, X_train[~old], y_train[~old], rounds)
+        model = XGBClassifier(**DEFAULT_PARAMS)
+        model.load_model(bytearray(booster.save_raw(raw_format='json')))
+        return model
+
+    return build
+
+
+def update(planets=None, retrain=False, rounds=CONTINUE_ROUNDS):
+    # returns the key of the served model once the appended planets are taken into account
+    planets = data_store.load('nea') if planets is None else planets
+    key, model, pipeline = reference_model()
+    new = appended_rows(planets, key)
+    if new.empty:
+        return key
+
+    if retrain:
+        pipeline = FeaturePipeline.fit(planets)
+        X, y, _ = pipeline.split(pipeline.transform(planets).join(planets[TARGET]))
+        model = get_model(X, y, pipeline=pipeline)
+        new_key = model_key(X, y, DEFAULT_PARAMS)
+    else:
+        new_key, model = _continue(key, model, pipeline, new, rounds)
+        X, y, _ = pipeline.split(pipeline.transform(planets).join(planets[TARGET]))
+        save_evaluation(new_key, X, y, build=_continued_build(planets, trained_rows(key), rounds),
+                        procedure=evaluation.CONTINUED.format(rounds=rounds))
+
+    _save_rows(new_key, trained_rows(key) | set(row_ids(new)))
+    publish(new_key, model, pipeline)
+    return new_key
+
+
+def update_failure(version, key):
+    # error of the failed update of the served model `key` for this catalog version, None if none failed
+    return _update_failures.get((version, key))
+
+
+def update_in_background(retrain=False, version=None):
+    # the sessions keep the served model while the update runs, only one update at a time;
+    # an update that failed is not run again until the catalog or the served model changes
+    attempt = (version, reference_model()[0])
+    if attempt in _update_failures or not _update_lock.acquire(blocking=False):
+        return None
+
+    def run():
+        try:
+            update(retrain=retrain)
+        except Exception:
+            _update_failures[attempt] = traceback.format_exc(limit=1)
+        finally:
+            _update_lock.release()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Met à jour le modèle servi avec les planètes ajoutées au catalogue.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    up = sub.add_parser('update', help="prend en compte les planètes ajoutées depuis le dernier entrainement")
+    up.add_argument('--retrain', action='store_true', help="réentraine entièrement au lieu de continuer le boosting")
+    up.add_argument('--rounds', type=int, default=CONTINUE_ROUNDS, help="arbres ajoutés par une mise à jour")
+    args = parser.parse_args(argv)
+
+    key = update(retrain=args.retrain, rounds=args.rounds)
+    print(f'modèle servi : {key}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Per-rerun timing of the named stages of the app.
+
+Streamlit runs the script of each session in its own thread, so the
+profiler of the current rerun is kept per thread. When profiling is off,
+``stage`` and ``timed`` cost a single attribute lookup.
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from data_store import ROOT_DIR
+
+
+LOG_PATH = os.environ.get('EXOPLANET_PROFILE_LOG', os.path.join(ROOT_DIR, 'logs', 'profile.jsonl'))
+
+_current = threading.local()
+
+
+def rss_mb():
+    # resident memory of the process, /proc is only available on Linux
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, AttributeError):
+        return float('nan')
+
+
+class Profiler:
+
+    def __init__(self, page=None):
+        self.page = page
+        self.records = []
+        self.depth = 0
+        self.start = self._last = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        # the record is added first so the nested stages are listed under it
+        record = {'stage': name, 'depth': self.depth, 'ms': None, 'rss_mb': None}
+        self.records.append(record)
+        start, rss = time.perf_counter(), rss_mb()
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            self._last = time.perf_counter()
+            record['ms'] = round((self._last - start) * 1000, 2)
+            record['rss_mb'] = round(rss_mb() - rss, 2)
+
+    def lap(self, name):
+        # time spent since the previous stage or lap, for the code that is not in a function
+        now = time.perf_counter()
+        self.records.append({'stage': name, 'depth': self.depth,
+                             'ms': round((now - self._last) * 1000, 2), 'rss_mb': None})
+        self._last = now
+
+    def table(self):
+        tab = pd.DataFrame(self.records, columns=['stage', 'depth', 'ms', 'rss_mb'])
+        tab['stage'] = ['  ' * d + s for s, d in zip(tab['stage'], tab['depth'])]
+        return tab.drop(columns='depth')
+
+    def total_ms(self):
+        return round((time.perf_counter() - self.start) * 1000, 2)
+
+    def export(self, path=None):
+        # one JSON line per rerun, to be aggregated over the production sessions
+        path = path or LOG_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        line = json.dumps({'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'pid': os.getpid(),
+                           'page': self.page, 'total_ms': self.total_ms(), 'stages': self.records})
+        with open(path, 'a') as f:
+            f.write(line + '\n')
+
+
+def start(enabled, page=None):
+    _current.profiler = Profiler(page) if enabled else None
+    return _current.profiler
+
+
+def current():
+    return getattr(_current, 'profiler', None)
+
+
+@contextlib.contextmanager
+def stage(name):
+    profiler = current()
+    if profiler is None:
+        yield
+    else:
+        with profiler.stage(name):
+            yield
+
+
+def lap(name):
+    profiler = current()
+    if profiler is not None:
+        profiler.lap(name)
+
+
+def timed(name=None):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current() is None:
+                return func(*args, **kwargs)
+            with stage(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,125 @@
+"""Background refresh of the local catalogs.
+
+    python refresher.py --interval 3600
+
+The sources (URLs or local files) are polled with conditional requests. By
+default each catalog is polled at the source it was ingested from (recorded
+in the manifest), data_store.SOURCES only for a catalog never ingested. A changed catalog is downloaded, parsed and written
+in the refresher thread, then published at once by data_store, so the
+sessions keep reading the previous version until the new one is complete.
+A failed poll only leaves the previous version in place.
+"""
+import argparse
+import os
+import threading
+import time
+import traceback
+
+import aggregates
+import data_store
+
+
+# secondes entre deux vérifications des sources
+INTERVAL = float(os.environ.get('EXOPLANET_REFRESH_S', 3600))
+
+
+class Refresher:
+
+    def __init__(self, sources=None, interval=INTERVAL, data_dir=None):
+        # None: the sources of the manifest, read again at each poll
+        self.sources = dict(sources) if sources else None
+        self.interval = interval
+        self.data_dir = data_dir
+        # state of the last poll of each catalog, shown by status()
+        self.checked = {}
+        self.errors = {}
+        self.published = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        # returns the catalogs published by this poll
+        published = []
+        sources = self.sources or data_store.sources(self.data_dir)
+        for name, source in sources.items():
+            try:
+                version = data_store.refresh(name, source, self.data_dir)
+            except Exception:
+                self.errors[name] = traceback.format_exc(limit=1)
+            else:
+                self.errors.pop(name, None)
+                if version is not None:
+                    published.append((name, version))
+            self.checked[name] = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+        if published:
+            # the tables of the new version are built here rather than by the first session
+            try:
+                aggregates.load_tables(self.data_dir)
+            except Exception:
+                self.errors['aggregates'] = traceback.format_exc(limit=1)
+            self.published.extend(published)
+        return published
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='refresher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self):
+        names = self.sources or data_store.SOURCES
+        return {'versions': {name: data_store.dataset_version(name, data_dir=self.data_dir) for name in names},
+                'checked': dict(self.checked), 'errors': dict(self.errors)}
+
+
+# refresher of the app, one per process whatever the number of sessions
+_refresher = None
+_lock = threading.Lock()
+
+
+def start(interval=INTERVAL):
+    global _refresher
+    with _lock:
+        if _refresher is None:
+            _refresher = Refresher(interval=interval).start()
+    return _refresher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Met à jour les catalogues locaux quand leur source change.")
+    parser.add_argument('--nea', default=None,
+                        help="URL ou fichier CSV de la NASA Exoplanet Archive (par défaut celle de la copie locale)")
+    parser.add_argument('--phl', default=None,
+                        help="URL ou fichier CSV du Planetary Habitability Laboratory (par défaut celle de la copie locale)")
+    parser.add_argument('--data-dir', default=None)
+    parser.add_argument('--interval', type=float, default=INTERVAL, help="secondes entre deux vérifications")
+    parser.add_argument('--once', action='store_true', help="une seule vérification")
+    args = parser.parse_args(argv)
+
+    sources = dict(data_store.sources(args.data_dir), **{name: getattr(args, name)
+                                                          for name in ('nea', 'phl') if getattr(args, name)})
+    refresher = Refresher(sources, args.interval, args.data_dir)
+    while True:
+        for name, version in refresher.poll():
+            print(f'{name}: version {version} publiée')
+        for name, error in refresher.errors.items():
+            print(f'{name}: échec de la mise à jour\n{error}')
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Headless habitability scoring of large candidate catalogs.
+
+    python score.py candidates.parquet predictions.csv --workers 8
+
+The candidates are read in chunks (CSV or Parquet), encoded with the same
+preprocessing as the "L'IA à l'aide des Astrophysicien" page, scored in
+batches across a process pool and written to the output as they come, so
+the memory used does not depend on the size of the catalog.
+"""
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import model_store
+
+
+ID_COL = 'pl_name'
+
+# state of each worker process, set once by _init_worker
+_worker = {}
+
+
+def iter_chunks(path, chunksize, columns):
+    # only the columns used by the model (and the planet name) are read
+    if path.endswith('.parquet'):
+        parquet = pq.ParquetFile(path)
+        columns = [c for c in parquet.schema_arrow.names if c in columns]
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=lambda c: c in columns)
+
+
+def _init_worker(key):
+    # one thread per worker, the pool already uses every core
+    _worker['model'] = model_store.load_model(key, model_store.DEFAULT_PARAMS).set_params(n_jobs=1)
+    _worker['pipeline'] = model_store.load_pipeline(key)
+
+
+def _score(batch):
+    return _worker['model'].predict(_worker['pipeline'].transform(batch))
+
+
+class PredictionWriter:
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = None
+        self.first = True
+
+    def write(self, df):
+        if self.path.endswith('.parquet'):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet is None:
+                self.parquet = pq.ParquetWriter(self.path, table.schema)
+            self.parquet.write_table(table)
+        else:
+            df.to_csv(self.path, mode='w' if self.first else 'a', header=self.first, index=False)
+        self.first = False
+
+    def close(self):
+        if self.parquet is not None:
+            self.parquet.close()
+
+
+def score_file(source, output, chunksize=100_000, batch_size=20_000, workers=None):
+    key, _, pipeline = model_store.reference_model()
+    columns = set(pipeline.columns) | {ID_COL}
+    workers = workers or os.cpu_count()
+
+    writer = PredictionWriter(output)
+    pending = deque()
+    rows = 0
+
+    def flush():
+        # writes the oldest chunk once all its batches are scored, keeping the input order
+        nonlocal rows
+        ids, futures = pending.popleft()
+        predictions = np.concatenate([f.result() for f in futures])
+        out = pd.DataFrame({'row': np.arange(rows, rows + len(predictions))})
+        if ids is not None:
+            out[ID_COL] = ids
+        out['prediction'] = predictions
+        writer.write(out)
+        rows += len(out)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(key,)) as pool:
+        for chunk in iter_chunks(source, chunksize, columns):
+            futures = [pool.submit(_score, chunk.iloc[i:i + batch_size])
+                       for i in range(0, len(chunk), batch_size)]
+            ids = chunk[ID_COL].values if ID_COL in chunk else None
+            pending.append((ids, futures))
+            # bounded number of chunks held in memory at the same time
+            while len(pending) > 2 * workers:
+                flush()
+        while pending:
+            flush()
+    writer.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prédit l'habitabilité d'un catalogue de planètes candidates.")
+    parser.add_argument('source', help="fichier CSV ou Parquet des planètes candidates")
+    parser.add_argument('output', help="fichier CSV ou Parquet des prédictions")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="lignes lues à la fois")
+    parser.add_argument('--batch-size', type=int, default=20_000, help="lignes envoyées à chaque processus")
+    parser.add_argument('--workers', type=int, default=None, help="nombre de processus (tous les coeurs par défaut)")
+    args = parser.parse_args(argv)
+
+    rows = score_file(args.source, args.output, args.chunksize, args.batch_size, args.workers)
+    print(f'{rows} planètes évaluées -> {args.output}')
+
+
+if __name__ == '__main__':
+    main()
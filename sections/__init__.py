@@ -0,0 +1,17 @@
+"""Pages of the app, one module per category of the sidebar.
+
+Each module is imported at the first visit of its page only and exposes
+``render(show)``, so a page does not pay for the imports and the data of
+the others.
+"""
+import streamlit as st
+
+import profiling
+
+
+def plotly_chart(fig, name, container=st):
+    # the time since the previous stage is the construction of the figure,
+    # the figures of figures.py arrive already built from the shared cache
+    profiling.lap(f'figure {name}')
+    with profiling.stage(f'st.plotly_chart {name}'):
+        container.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,84 @@
+"""Page "Accueil"."""
+import streamlit as st
+
+import data_store
+import figures
+from sections import plotly_chart
+
+
+def render(show):
+    nea_version = data_store.dataset_version('nea')
+
+    st.title('Exoplanet Discovery')
+    st.subheader('Notre mission : _Donner vie à la data_')
+
+    st.markdown(
+        """
+        Fermi était septique :
+
+        _« S'il y avait des civilisations extraterrestres, leurs représentants 
+        devraient être déjà chez nous. Où sont-ils donc ? »_
+        
+        Si la question n'a pas de réponse, c'est le principe même de ce paradoxe, 
+        elle souligne tout de même la volonté qu'à l'homme de pouvoir rencontrer son alter-égo.
+
+        Si ce n'est pas des civilisations extraterrestres qui nous ont trouvé, alors c'est à nous de les chercher. 
+        Les pieds sur terre, la tête dans les étoiles. Nous scrutons le ciel pour 
+        trouver une terre qui nous ressemble. Ce sont les _Exoplanètes_.
+        """
+    )
+
+    col1, col2 = st.beta_columns(2)
+    with col1:
+        st.title(" ")
+        st.markdown(
+            """
+            Il faut attendre __1995 pour que la première exoplanète apparaisse__ devant nos yeux et 
+            relance la course à la recherche de la vie. Mars n’est plus le seul horizon. 
+            L’espoir se propage à présent jusqu’au confins de l’univers.
+
+            C’est aujourd’hui __4383 exoplanètes__ qui ont été découvertes. 
+
+            Dans ce total toutefois, seulement __moins de 1,5% sont considérées remplissant 
+            suffisamment de conditions pour accueillir une forme de vie__. 
+            """
+        )
+    with col2:
+        fig = figures.decades(nea_version)
+        plotly_chart(fig, 'décennies')
+    
+    st.markdown(
+        """
+        Nous vous proposons de partir ensemble pour un voyage dans les méandres de l’univers. 
+        Où les températures ardentes flirtent avec le zéro absolu et où le vide est la règle et la vie l’exception.
+
+        Partons ensemble à la rencontre des exoplanetes
+        """)
+
+    st.title(" ")
+    col1, col2, col3 = st.beta_columns([1, 4, 1])
+    with col2:
+        st.image("https://github.com/MickaelKohler/Exoplanet_Discovery/raw/main/Ressources/galaxy-red-green-illustration-wallpaper.png",
+                 caption="Ceci n'est pas une exoplanète")
+
+    expander = st.beta_expander("Les technologies utilisées")
+    expander.write('Plusieurs librairies de _Python_ ont été utilisées pour la réalisation de ce site : ')
+    col1, col2, col3, col4 = expander.beta_columns(4)
+    with col1:
+        st.write('__Gestion des base de données__')
+        st.image('https://raw.githubusercontent.com/MickaelKohler/Exoplanet_Discovery/main/Ressources/tool_pandas.png')
+    with col2:
+        st.write('__Création du modèle de ML__')
+        st.image('https://raw.githubusercontent.com/MickaelKohler/Exoplanet_Discovery/main/Ressources/1200px-Scikit_learn_logo_small.svg.png')
+    with col3:
+        st.write('__Création des graphiques__')
+        st.image('https://raw.githubusercontent.com/MickaelKohler/Exoplanet_Discovery/main/Ressources/logo_plotly.png')
+    with col4:
+        st.write('__Création de la WebApp__')
+        st.image('https://raw.githubusercontent.com/MickaelKohler/Exoplanet_Discovery/main/Ressources/1*u9U3YjxT9c9A1FIaDMonHw.png')
+
+    col1, col2 = expander.beta_columns([7, 1])
+    with col2:
+        st.title(" ")
+        st.write('_une production_')
+        st.image('https://raw.githubusercontent.com/MickaelKohler/Exoplanet_Discovery/main/Ressources/Logo%20pirate%20duck.png')
@@ -0,0 +1,214 @@
+"""Page "Les Exoplanètes habitables"."""
+import math
+
+import pandas as pd
+import streamlit as st
+
+import aggregates
+import data_store
+import derived
+import figures
+from sections import plotly_chart
+
+
+def render(show):
+    nea_version = data_store.dataset_version('nea')
+    phl_version = data_store.dataset_version('phl')
+
+    tables = derived.habitable_tables(nea_version, phl_version)
+
+    st.title('Les caractéristiques des Exoplanètes habitables')
+    st.subheader('Où sont elles et quels sont leurs projets')
+
+    st.markdown(
+        """
+        On dénombre dans la base de données plus de *** exoplanètes et seulement *** qui sont considérées 
+        comme pouvant potentiellement habriter la vie.
+        """
+    )
+
+    # réparition des planètes
+    fig = figures.constellations(nea_version, phl_version)
+
+    col1, col2 = st.beta_columns([3, 1])
+    with col1:
+        plotly_chart(fig, 'constellations')
+    with col2:
+        st.title(" ")
+        st.markdown(
+            """
+            Le tableau interactif ci-contre vous présente la position de l’ensemble des exoplanètes habitables.
+            Vous avez :
+            - _Sur le cercle intérieur_ : les constellations.
+            - _Sur le cercle extérieur_ : les systèmes solaire.
+            
+            Vous pouvez cliquer sur le système pour afficher les noms des exoplanètes habitables qui le composent. 
+            """)
+
+    nearest = derived.nearest_habitable(nea_version, phl_version, k=5)
+    planet_name, planet_dist = nearest.iloc[0][['pl_name', 'sy_dist']]
+    planet_distance = round(planet_dist*3.26156, 2)
+    st.markdown(
+        f"""
+        __Où se situe la planète la plus proche ?__ La planète potentiellement habitables 
+        la plus proche est __{planet_name}__, qui est située à {planet_distance} années lumières.
+
+        A savoir, qu'il faudait _76 624 993 ans_ de voyage à la sonde _Voyager 1_ pour atteindre cette exoplanète.
+        
+        Pour qu'une planète soit considéré comme habitable, elle doit être située dans la __Zone Habitable__ 
+        qui est la région de l’espace où les conditions sont favorables à l’apparition de la vie, 
+        telle que nous la connaissons sur Terre.
+
+        Les limites des zones habitables sont calculées à partir des éléments connus de la biosphère de la Terre, 
+        comme sa position dans le Système solaire et la quantité d'énergie qu'elle reçoit du Soleil.  
+        
+        Le graphique ci-dessous permet de bien percevoir cette _Zone Habitable_, 
+        les exoplanètes devant s'éloigner à mesure que son étoile gagne en puissance.       
+        """
+    )
+    if show:
+        st.dataframe(nearest.assign(sy_dist=(nearest['sy_dist'] * 3.26156).round(2))
+                     .rename(columns={'pl_name': 'Exoplanète', 'hostname': 'Etoile',
+                                      'sy_dist': 'Distance (années lumières)'}))
+
+    # zone habitable, les curseurs interrogent l'index de la zone (voir zone_index.py)
+    zone = derived.zone_index(nea_version, phl_version)
+    col1, col2 = st.beta_columns(2)
+    with col1:
+        # the bounds of the sliders are those of the indexed catalog
+        dist_max = max(2.0, math.ceil(zone.range('P_DISTANCE')[1] * 10) / 10)
+        distance = st.slider('Distance planète/étoile', 0.0, dist_max, (0.0, 2.0), step=0.1)
+    with col2:
+        temp_max = zone.range('S_TEMPERATURE')[1]
+        temperature = st.slider('Température du soleil', 0, int(temp_max) + 1, (2500, 8000), step=100)
+    fig = figures.habitable_zone(nea_version, phl_version, distance, temperature)
+    plotly_chart(fig, 'zone habitable')
+
+    expander = st.beta_expander("Illustration de la zone habitable dans notre système solaire")
+    expander.image('https://raw.githubusercontent.com/MickaelKohler/Exoplanet_Discovery/main/Ressources/zone_habitable_systeme_solaire_espace_stellaire_1024x1024.jpg')
+
+    st.markdown("---")
+    
+    # Comparatif Habitable/inhabitable
+    st.subheader("Qu'est ce qui caractérise une planète habitable ?")
+    st.markdown(
+        """
+        La _Zone Habitable_ met en avant la nécessité de déterminer les critères 
+        qui font qu’une exoplanète soit suspectée comme pouvant être habitable. 
+
+        On peut donc tenter de comparer les caractéristiques des exoplanètes 
+        considérées comme habitables de l’ensemble des exoplanètes.
+
+        Restons dans les étoiles et essayons de répondre à la question : 
+        _Quelle type d’étoile favorise la présence d’exoplanètes habitables ?_
+        """
+    )
+
+    # Sun Type
+    sType_tab = aggregates.share_table(tables, 'S_TYPE_TEMP', aggregates.STAR_TYPES)
+    fig = figures.star_types(nea_version, phl_version)
+
+    if show:
+        col1, col2 = st.beta_columns([1, 3])
+        with col2:
+            plotly_chart(fig, 'types étoiles')
+        with col1:
+            st.title(' ')
+            st.dataframe(sType_tab)
+    else:
+        plotly_chart(fig, 'types étoiles')
+   
+    col1, col2 = st.beta_columns([1, 2])
+    with col1:
+        st.markdown(
+            """
+            On peut constater que ce sont surtout les étoiles de type K et M qui comprennent 
+            le plus d’exoplanètes habitables. Ce qui s’explique sans doute par 
+            le faite que ce sont les plus petites et donc les moins chaudes. 
+
+            Le tableau ci-contre explique la différence entre chaque type.
+            """)
+
+    with col2:
+        sol_typ = pd.DataFrame(data=[['> 25 000 K', 'bleue', 'azote, carbone, hélium et oxygène'],
+                                     ['10 000–25 000 K', 'bleue-blanche', 'hélium, hydrogène'],
+                                     ['7 500–10 000 K', 'blanche', 'hydrogène'],
+                                     ['6 000–7 500 K', 'jaune-blanche',
+                                      'métaux : fer, titane, calcium, strontium et magnésium'],
+                                     ['5 000–6 000 K', 'jaune (comme le Soleil)',
+                                      'calcium, hélium, hydrogène et métaux'],
+                                     ['3 500–5 000 K', 'orange', 'métaux et monoxyde de titane'],
+                                     ['< 3 500 K', 'rouge', 'métaux et monoxyde de titane']],
+                               index=['O', 'B', 'A', 'F', 'G', 'K', 'M'],
+                               columns=['température', 'couleur conventionnelle', "raies d'absorption"])
+        st.write(sol_typ)
+    
+    # Sun Age
+    sAge_tab = aggregates.share_table(tables, 'S_AGE', aggregates.AGE_LABELS, labels=aggregates.AGE_LABELS)
+    fig = figures.star_ages(nea_version, phl_version)
+
+    if show:
+        col1, col2 = st.beta_columns([3, 1])
+        with col1:
+            plotly_chart(fig, 'âge étoiles')
+        with col2:
+            st.title(' ')
+            st.dataframe(sAge_tab, height=360)
+    else:
+        plotly_chart(fig, 'âge étoiles')
+
+    st.markdown(
+        """
+        Toujours dans les étoiles, on remarque que les exoplanètes observées sont essentiellement situées 
+        sur les __étoiles les plus jeunes__, même si aucune tranche d’âge ne sort du lot. 
+
+        Pour que la vie puisse apparaître sur une planète, il ne suffit pas qu'elle soit dans l'écosphère de son 
+        étoile ; son système planétaire doit se situer __assez près du centre de la galaxie__ pour avoir suffisamment 
+        d'éléments lourds qui favorisent la formation de planètes telluriques et des 
+        atomes nécessaires à la vie (fer, cuivre, etc).
+
+        Mais ce système devra également se situer __assez loin du centre galactique__ pour éviter des dangers tels que 
+        le trou noir au centre de la galaxie et les supernova.
+
+        Mais l'exoplanète en elle même doit présenter des conditions intrinsèque pour 
+        être une bonne candidate pour accueillir la vie. 
+        """
+    )
+
+    # Exoplanet type
+    pType_tab = aggregates.share_table(tables, 'P_TYPE', aggregates.PLANET_TYPES)
+    fig = figures.planet_types(nea_version, phl_version)
+
+    col1, col2 = st.beta_columns([3, 1])
+    with col1:
+        plotly_chart(fig, 'types planètes')
+    with col2:
+        if show:
+            st.title(" ")
+            st.dataframe(pType_tab)
+        else:
+            st.title(" ")
+            st.markdown(
+                """
+                Les type d'exoplanet selon
+                la masse de la terre (MT): 
+                - _Miniterran_ : -0,1 MT
+                - _Subterran_ : 0,1 à 0,5 MT
+                - _Terran_ : 0,5 à 2 MT
+                - _Superterran_ : 2 à 10 MT
+                - _Neptunian_ : 10 à 50 MT
+                - _Jovian_ : +50 MT 
+                """
+            )
+    
+    st.markdown(
+        """
+        Les exoplanète habitables sont essentiellement situées sur des planètes équivalentes 
+        à la terre ou légèrement plus grosse. Comme pour la _Zone Habitable_, la conditions de 
+        validité pour être considérée comme une exoplanète habitable est très restreinte. 
+
+        Ces conditions ne sont bien sur pas limitatives. Il existe de nombreux critères à prendre en compte. 
+        De nombreuses variables qui peuvent être étudiées par un algorithme afin de 
+        pouvoir créer un modèle permettant de repérer les exoplanètes.
+        """
+    )
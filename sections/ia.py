@@ -0,0 +1,168 @@
+"""Page "L'IA à l'aide des Astrophysicien", the only one importing the ML stack."""
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import compare_models
+import data_store
+import derived
+import figures
+import model_store
+from sections import plotly_chart
+
+
+def render(show):
+    nea_version = data_store.dataset_version('nea')
+
+    st.title("L'intelligence artificielle à la recherche de la vie")
+    st.subheader("Comment le Machine Learning peut venir à l'aide des Astrophysicien")
+    st.title(" ")
+
+    st.markdown(
+        """
+        Lors de notre recherche de la base de donnée parfaite (BDP), nous avons trouvé une base de donnée 
+        hébergée par _Planetary Hability Laboratory_ qui tente de répertorier et identifier les exoplanètes habitables.
+
+        Toutefois, leur base de donnée ne prend pas en considération les dernières 
+        exoplanètes découvertes à partir de début 2020. 
+
+        Nous avons donc tenté d’entrainer un __algorithme de Machine Learning__ pour déterminer, 
+        selon les caractéristiques de chaque exoplanète, si elle peut être catégorisée comme habitable ou non, 
+        dans le but de catégoriser celles qui n’ont pas été identifiée.
+        """
+    )
+
+    # modèle servi : quand des planètes ont été ajoutées au catalogue, il est mis à jour
+    # en arrière-plan et remplacé une fois prêt
+    model_key = model_store.reference_model()[0]
+    if derived.appended_rows(nea_version, model_key):
+        model_store.update_in_background(version=nea_version)
+        failure = model_store.update_failure(nea_version, model_key)
+        if failure is not None:
+            st.warning(f"La mise à jour du modèle a échoué, le modèle {model_key} reste utilisé : {failure}")
+
+    # prédictions du modèle sur les exoplanètes non répertoriées par le PHL
+    df_final = derived.prediction_table(nea_version, model_key)
+
+    st.title(' ')
+    ML_off = True
+    col1, col2 = st.beta_columns([1, 3])
+    with col1:
+        st.markdown(
+            """
+            __Cliquez sur le bouton ci-dessous__ pour rechercher de nouvelles planètes 
+            ayant le potentielle d'être habitable. 
+            """
+        )
+        if st.button('Rechercher la vie'):
+            ML_off = False
+            st.markdown(
+                """
+                Comme vous pouvez le voir, __aucune nouvelle exoplanète ne 
+                remplit les conditions__ pour pouvoir accueillir la vie. 
+
+                La recherche continue…
+
+                _« I want to believe »_
+                """
+            )
+    with col2:
+        if ML_off:
+            st.dataframe(derived.prediction_table(nea_version, model_key, hidden=True), height=550)
+        else:
+            st.dataframe(df_final, height=550)
+
+    expander = st.beta_expander("Explication du modèle retenu")
+    expander.markdown(
+        """
+        ___Quel modèle a été retenu ?___
+
+        Nous avons testé les algorithmes de classification les plus 
+        pertinents afin de prédire si une planète est habitable.
+
+        Lors de ces tests, les algorithmes, ci-dessous, ont produit les résultats les plus proches 
+        de la réalités (scores), c'est à dire en comparant nos résultats aux informations à notre disposition.
+
+        Bien que les meilleurs scores soient supérieurs à celui du XGBoost, que nous avons choisit, 
+        ce dernier a été plus à même de prédire les planètes habitables connues.
+        """)
+        
+    # évaluation du modèle servi sur les planètes mises de côté, calculée une fois avec le modèle
+    report = derived.evaluation(nea_version, model_key)
+
+    # scores de la validation croisée (voir compare_models.py), celui du modèle servi à défaut
+    dataScore = compare_models.read_table()
+    if dataScore is None and report is not None:
+        dataScore = pd.DataFrame({'Test': ['XGBoost'], 'Score': [report['accuracy']]})
+
+    if dataScore is not None:
+        fig = px.histogram(data_frame=dataScore,
+                           x="Test",
+                           y="Score",
+                           title="Score des différents test").update_xaxes(categoryorder="total descending")
+
+        # the axis starts just under the lowest score, whatever it is
+        fig.update_yaxes(range=[max(0.0, dataScore['Score'].min() - 0.01), 1])
+        fig.update_layout(xaxis_title="Score", yaxis_title="Test")
+
+        plotly_chart(fig, 'scores', expander)
+
+    expander.markdown(
+        """
+        ___Qu'est-ce que le XGBoost ?___
+
+        XGBoot est la Extrême Gradient Boosted Trees, plus simplement 
+        il s'agit d'une forêt d'arbres de décision optimisée.
+
+        "Un arbre de décision est un outil d'aide à la décision représentant 
+        un ensemble de choix sous la forme graphique d'un arbre. 
+        Les différentes décisions possibles sont situées aux extrémités des branches (les « feuilles » de l'arbre), 
+        et sont atteintes en fonction de décisions prises à chaque étape" 
+        [source](https://fr.wikipedia.org/wiki/Arbre_de_d%C3%A9cision)
+        """
+    )
+
+    if report is None:
+        expander.markdown(
+            """
+            ___Que vaut le modèle sur des planètes qu'il n'a jamais vues ?___
+
+            Aucune évaluation n'a été enregistrée avec ce modèle : les modèles entrainés par blocs 
+            (`chunked_training.py`) ne mettent pas de planètes de côté.
+            """)
+    else:
+        size_kb = report['size']['bytes'] / 1024 if report['size']['bytes'] else float('nan')
+        expander.markdown(
+            f"""
+            ___Que vaut le modèle sur des planètes qu'il n'a jamais vues ?___
+
+            Un quart des planètes connues ({report['rows_test']}) a été mis de côté, 
+            le modèle est construit sur les {report['rows_train']} autres de la même façon que le modèle servi 
+            ({report.get('procedure', 'entrainement complet')}).
+
+            | Mesure | Valeur |
+            |---|---|
+            | Exactitude | {report['accuracy']:.1%} |
+            | Précision sur les planètes habitables | {report['habitable']['precision']:.1%} |
+            | Rappel sur les planètes habitables | {report['habitable']['recall']:.1%} ({report['habitable']['support']} planètes) |
+            | Score de Brier (probabilité d'être habitable) | {report['brier']:.4f} |
+            | Prédiction d'un lot | {report['latency']['batch_us_per_row']} µs par planète |
+            | Prédiction d'une seule planète | {report['latency']['single_row_ms']} ms |
+            | Taille du modèle | {size_kb:.0f} Ko, {report['size']['rounds']} tours de boosting |
+            """)
+        plotly_chart(figures.confusion(nea_version, model_key), 'confusion', expander)
+        plotly_chart(figures.calibration(nea_version, model_key), 'calibration', expander)
+
+    # contributions de chaque caractéristique aux prédictions (TreeSHAP, calculées une fois par modèle)
+    expander.markdown(
+        """
+        ___Sur quoi reposent les prédictions ?___
+
+        Pour chaque exoplanète, la prédiction se décompose en contributions de chacune de ses caractéristiques.
+        Leur moyenne donne les caractéristiques qui comptent le plus pour le modèle.
+        """)
+    plotly_chart(figures.importance(nea_version, model_key), 'importance', expander)
+
+    planet = expander.selectbox("Détail d'une exoplanète", df_final["Nom de l'Exoplanète"].tolist())
+    if planet is not None:
+        plotly_chart(figures.planet_contributions(nea_version, model_key, planet), 'contributions', expander)
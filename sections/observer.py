@@ -0,0 +1,81 @@
+"""Page "Observer les Exoplanètes"."""
+import streamlit as st
+
+import data_store
+import derived
+import discovery_stats
+import figures
+from sections import plotly_chart
+
+
+def render(show):
+    nea_version = data_store.dataset_version('nea')
+
+    st.title('Comment découvrir des Exoplanètes')
+    st.subheader("La découverte d'un nouveau Monde")
+
+    st.markdown(
+        """
+        Le 6 octobre 1995, les astronomes Michel Mayor et Didier Queloz, annoncent la découverte d'une première 
+        exoplanète. Cette planète, nommée __51 Pegasi B__, se  situe à une cinquantaine 
+        d'années lumière de la Terre dans la constelation du Pégase.
+        """
+    )
+
+    period = st.selectbox('Regrouper les découvertes par', list(discovery_stats.PERIODS))
+    fig = figures.discoveries(nea_version, discovery_stats.PERIODS[period])
+    plotly_chart(fig, 'découvertes')
+
+    if show:
+        df_hist = derived.discovery_pivot(nea_version)
+        st.dataframe(df_hist)
+    
+    st.markdown("""
+    ___Qu'est ce que la méthode des vitesses radiales___
+
+    La force de gravité des planètes modifie le déplacement de leur étoile.
+    Les capteurs situés sur Terre vont détecter des spectres passant d'une couleur bleu à une couleur rouge. 
+    Le décalage de temps durant le changement de couleurs permet de déduire des paramètres 
+    physiques comme la vitesse, la masse et la distance.
+    
+    ___Et la méthode la méthode du transit ?___
+
+    Cette méthode consiste en l'observation d'une répétition constante d'une __variation de luminosité__ d'une étoile.
+    Lorsqu'une planète passe devant une étoiles, elle crée une zone d'ombre 
+    qui font varier la luminosité captée depuis la Terre.
+    """)
+
+    col1, col2, col3 = st.beta_columns([1, 3, 1])
+    lk = 'https://raw.githubusercontent.com/MickaelKohler/Exoplanet_Discovery/main/Ressources/Astronomical_Transit.gif'
+    with col2:
+        st.markdown(f"![Alt Text]({lk})")
+
+    fig = figures.methods(nea_version)
+    plotly_chart(fig, 'méthodes')
+
+    st.subheader("La contribution de Kepler dans la recherches d'exoplanètes")
+    st.markdown(
+        """
+        Les méthodes de détection des exoplanètes peuvent être appliquées sur Terre mais aussi directement depuis 
+        l'espace. Elles nécessitent l'utilisation d'équipement spécifiques capable d'enregistrer l'image des spectres 
+        lumineux. Ces équipements peuvent aller du plus pointus aux simple télescope ou appareil photo.
+        """)
+
+    # Groupe les objectifs photos et groupes les telescopes
+    fig = figures.telescopes(nea_version)
+
+    col1, col2 = st.beta_columns([2, 1])
+    with col1:
+        plotly_chart(fig, 'télescopes')
+    with col2:
+        st.title('')
+        st.markdown(
+            """
+            En 2009, l'engin spatial Kepler est envoyé en orbite avec l'objectif de 
+            recenser les planètes similaire à la Terre.
+            
+            Il a été conçu pour utiliser la méthode des transits par l'intermédiaire d télescope de 0.98 mètre 
+            de diamètre équipé d'un détecteur mesurant l'intensité lumineuse des étoiles.
+            
+            La mission de Kepler s'est terminée en 2019 après la découverte record de plus de 2600 exoplanètes. 
+            """)
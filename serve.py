@@ -0,0 +1,295 @@
+"""Habitability prediction of single planets over HTTP/JSON.
+
+    python serve.py serve --port 8502
+    curl -d '{"pl_name": "...", "disc_year": 2021, "pl_orbper": 12.3, ...}' localhost:8502/predict
+    curl localhost:8502/stats
+
+The planets are encoded straight from the JSON dicts into a float32 matrix
+(see FeaturePipeline.encode_record), without pandas on the request path.
+Concurrent requests are coalesced into micro-batches before reaching the
+model, and the server reports its p50/p99 latency on /stats. That latency is
+measured in the server, from the request read to the response written; the
+network and the client are not included. ``python serve.py bench`` is a small
+load generator for a running server, its latencies are the round trips seen
+by the clients.
+"""
+import argparse
+import http.client
+import json
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import data_store
+import model_store
+from features import TARGET
+
+
+LABELS = {0: 'Inhabitable', 1: 'Habitable', 2: 'Habitable'}
+
+
+class LatencyStats:
+
+    def __init__(self, size=10_000):
+        self._latencies = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds * 1000)
+            self.count += 1
+
+    def summary(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+        if not len(latencies):
+            return {'count': self.count}
+        p50, p99 = np.percentile(latencies, [50, 99])
+        return {'count': self.count, 'p50_ms': round(p50, 3), 'p99_ms': round(p99, 3),
+                'max_ms': round(latencies.max(), 3)}
+
+
+class MicroBatcher:
+    # the requests waiting at the same time are predicted in a single call to the model
+
+    def __init__(self, key, model, pipeline, max_batch=64, max_wait=0.001):
+        self.key = key
+        self.booster = model.get_booster()
+        self.pipeline = pipeline
+        self._checked = time.monotonic()
+        # last error of a model that could not be loaded, the current one is still served
+        self.refresh_error = None
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.batches = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, records):
+        future = Future()
+        self.queue.put((records, future))
+        return future
+
+    def encode(self, records):
+        # float32 matrix in the model order, built straight from the dicts (no DataFrame);
+        # a planet that cannot be encoded gets an error instead of a row
+        X = np.empty((len(records), len(self.pipeline.columns)), dtype='float32')
+        errors = {}
+        for i, record in enumerate(records):
+            try:
+                self.pipeline.encode_record(record, X[i])
+            except (TypeError, ValueError) as e:
+                errors[i] = f'{type(e).__name__}: {e}'
+        valid = np.array([i for i in range(len(records)) if i not in errors], dtype='int64')
+        return X[valid], valid, errors
+
+    def predict(self, records):
+        # inplace_predict skips the DMatrix conversion, the columns are already in the model order
+        X, valid, errors = self.encode(records)
+        if len(X):
+            proba = self.booster.inplace_predict(X)
+            if proba.ndim == 1:
+                proba = np.column_stack([1 - proba, proba])
+        else:
+            proba = np.zeros((0, 2), dtype='float32')
+        return proba.argmax(axis=1), proba, valid, errors
+
+    def _refresh(self):
+        # picks up a model published by model_store.update(), checked at most once per second
+        now = time.monotonic()
+        if now - self._checked < 1:
+            return
+        self._checked = now
+        try:
+            key, model, pipeline = model_store.serving_model()
+            if key != self.key:
+                self.key, self.booster, self.pipeline = key, model.get_booster(), pipeline
+            self.refresh_error = None
+        except Exception as e:
+            # the batcher thread must not die, the requests would wait forever
+            self.refresh_error = f'{type(e).__name__}: {e}'
+
+    def _run(self):
+        while True:
+            pending = [self.queue.get()]
+            self._refresh()
+            size = len(pending[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+                size += len(pending[-1][0])
+
+            records = [record for recs, _ in pending for record in recs]
+            try:
+                results = self._results(len(records), *self.predict(records))
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+
+            start = 0
+            for recs, future in pending:
+                end = start + len(recs)
+                future.set_result(results[start:end])
+                start = end
+
+    @staticmethod
+    def _results(n, predictions, proba, valid, errors):
+        # one entry per planet, an invalid planet only fails its own entry
+        results = [{'error': errors[i]} if i in errors else None for i in range(n)]
+        # float64 before rounding, or the JSON carries the float32 noise (0.9972000122070312)
+        proba = proba.astype('float64').round(4)
+        for i, p, pr in zip(valid, predictions, proba):
+            results[i] = {'prediction': int(p), 'label': LABELS.get(int(p)), 'proba': pr.tolist()}
+        return results
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are two writes on a keep-alive connection, with Nagle
+    # the body waits for the delayed ACK of the headers (~40 ms per response)
+    disable_nagle_algorithm = True
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send(200, dict(self.server.stats.summary(), batches=self.server.batcher.batches,
+                                 measured='server side, request read to response written'))
+        elif self.path == '/health':
+            self._send(200, {'status': 'ok', 'model': self.server.batcher.key,
+                             'refresh_error': self.server.batcher.refresh_error})
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        if self.path != '/predict':
+            self._send(404, {'error': 'not found'})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        except ValueError:
+            self._send(400, {'error': 'invalid JSON'})
+            return
+        # une planète ou une liste de planètes
+        records = payload if isinstance(payload, list) else [payload]
+        if not records or not all(isinstance(r, dict) for r in records):
+            self._send(400, {'error': 'expected a planet object or a list of planet objects'})
+            return
+
+        try:
+            results = self.server.batcher.submit(records).result()
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+            return
+        if isinstance(payload, list):
+            # the errors are given per planet, the valid ones are still predicted
+            self._send(200, results)
+        else:
+            self._send(422 if 'error' in results[0] else 200, results[0])
+        self.server.stats.add(time.perf_counter() - start)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host='127.0.0.1', port=8502, max_batch=64, max_wait=0.001):
+    key, model, pipeline = model_store.reference_model()
+    server = ThreadingHTTPServer((host, port), PredictionHandler)
+    server.daemon_threads = True
+    server.batcher = MicroBatcher(key, model, pipeline, max_batch, max_wait)
+    server.stats = LatencyStats()
+    # warm up the model so the first request does not pay for it
+    server.batcher.predict([{}])
+    return server
+
+
+def sample_planets(n=1000):
+    # planètes non répertoriées par le PHL, sans les valeurs manquantes
+    planets = data_store.load('nea')
+    planets = planets[planets[TARGET].isna()].drop(columns=TARGET)
+    records = planets.sample(min(n, len(planets)), random_state=0).to_dict('records')
+    return [{k: v for k, v in record.items() if pd.notna(v)} for record in records]
+
+
+def load_test(host, port, requests=5000, concurrency=32):
+    planets = [json.dumps(p, default=lambda v: v.item() if hasattr(v, 'item') else str(v)).encode()
+               for p in sample_planets()]
+    latencies = []
+    lock = threading.Lock()
+
+    def client(n):
+        conn = http.client.HTTPConnection(host, port)
+        local = []
+        for _ in range(n):
+            start = time.perf_counter()
+            conn.request('POST', '/predict', body=random.choice(planets),
+                         headers={'Content-Type': 'application/json'})
+            conn.getresponse().read()
+            local.append((time.perf_counter() - start) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(requests // concurrency,)) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return {'requests': len(latencies), 'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(p50, 3), 'p99_ms': round(p99, 3), 'measured': 'client side, full round trip'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur de prédiction d'habitabilité.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help="lance le serveur HTTP")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8502)
+    serve.add_argument('--max-batch', type=int, default=64, help="taille maximale d'un micro-batch")
+    serve.add_argument('--max-wait-ms', type=float, default=1.0, help="attente maximale avant de prédire")
+
+    bench = sub.add_parser('bench', help="générateur de charge pour un serveur lancé")
+    bench.add_argument('--host', default='127.0.0.1')
+    bench.add_argument('--port', type=int, default=8502)
+    bench.add_argument('--requests', type=int, default=5000)
+    bench.add_argument('--concurrency', type=int, default=32)
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        server = make_server(args.host, args.port, args.max_batch, args.max_wait_ms / 1000)
+        print(f'modèle {server.batcher.key} servi sur http://{args.host}:{args.port}/predict')
+        server.serve_forever()
+    else:
+        print(json.dumps(load_test(args.host, args.port, args.requests, args.concurrency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
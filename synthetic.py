@@ -0,0 +1,153 @@
+"""Synthetic NEA and PHL catalogs of any size, for scale tests without network.
+
+    python synthetic.py synthetic/ --scale 1000 --chunk-rows 200000
+
+The generator learns from the local catalogs (see data_store.py) the
+distribution of every column (quantiles for the numbers, frequencies for
+the categories and texts) and the combinations of missing values of their
+rows. It then writes ``nea.parquet`` and ``phl.parquet`` chunk by chunk,
+with the same columns and dtypes, so the memory used does not depend on the
+size of the catalog. The planets are named ``SYN-<n> b`` in both catalogs,
+so they can be joined like the real ones.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import data_store
+
+
+# number of quantiles kept per numerical column
+QUANTILES = 257
+# columns computed at ingestion, not part of the raw catalogs
+DERIVED_COLS = (data_store.ID_COL, 'telescope_group')
+# columns generated from the row number, so they stay unique
+NAME_COLS = {'nea': {'pl_name': '{} b', 'hostname': '{}'}, 'phl': {'P_NAME': '{} b'}}
+
+
+def learn(df, names=None):
+    # profile of each column and of the patterns of missing values,
+    # `names` maps the name columns to the template of their generated values
+    columns = []
+    for col in df.columns:
+        if col in DERIVED_COLS:
+            continue
+        values = df[col]
+        known = values.dropna()
+        profile = {'name': col, 'dtype': str(values.dtype)}
+        if names and col in names:
+            profile.update(kind='name', template=names[col])
+        elif pd.api.types.is_bool_dtype(values) or not pd.api.types.is_numeric_dtype(values):
+            frequencies = known.astype(str).value_counts()
+            profile.update(kind='category', values=frequencies.index.tolist(),
+                           weights=(frequencies / frequencies.sum()).tolist())
+        else:
+            quantiles = np.quantile(known.to_numpy(dtype='float64'), np.linspace(0, 1, QUANTILES)) \
+                if len(known) else np.zeros(QUANTILES)
+            profile.update(kind='number', quantiles=quantiles.tolist(),
+                           integer=bool(len(known) and (known % 1 == 0).all()))
+        columns.append(profile)
+
+    # combinations of missing columns, with their frequency
+    mask = df[[c['name'] for c in columns]].isna().to_numpy()
+    patterns, counts = np.unique(mask, axis=0, return_counts=True)
+    return {'rows': len(df), 'columns': columns,
+            'patterns': [np.packbits(p).tolist() for p in patterns],
+            'weights': (counts / counts.sum()).tolist()}
+
+
+class Generator:
+
+    def __init__(self, profile, seed=0):
+        self.profile = profile
+        self.columns = profile['columns']
+        self.rng = np.random.default_rng(seed)
+        self.patterns = np.unpackbits(np.array(profile['patterns'], dtype='uint8'),
+                                      axis=1, count=len(self.columns)).astype(bool)
+        self.weights = np.array(profile['weights'])
+        self.levels = np.linspace(0, 1, QUANTILES)
+
+    def _column(self, profile, rows):
+        n = len(rows)
+        if profile['kind'] == 'name':
+            prefix, suffix = profile['template'].split('{}')
+            return prefix + 'SYN-' + pd.Series(rows).astype(str) + suffix
+        if profile['kind'] == 'category':
+            values = np.array(profile['values'], dtype=object)
+            codes = self.rng.choice(len(values), n, p=profile['weights']) if len(values) else np.zeros(n, int)
+            series = pd.Series(values[codes] if len(values) else np.full(n, None), dtype=object)
+            if profile['dtype'] == 'category':
+                # the same categories in every chunk, so the Parquet schema does not change
+                series = series.astype(pd.CategoricalDtype(profile['values']))
+            return series
+        values = np.interp(self.rng.random(n), self.levels, profile['quantiles'])
+        if profile['integer']:
+            values = np.round(values)
+        return pd.Series(values)
+
+    def chunk(self, start, size):
+        rows = np.arange(start, start + size)
+        missing = self.patterns[self.rng.choice(len(self.patterns), size, p=self.weights)]
+        frame = {}
+        for i, profile in enumerate(self.columns):
+            series = self._column(profile, rows)
+            if missing[:, i].any() and profile['kind'] != 'name':
+                series = series.mask(missing[:, i])
+            if profile['kind'] == 'number':
+                # an integer column of the catalog has no missing value, it keeps its dtype
+                series = series.astype(profile['dtype'] if profile['dtype'].startswith('int') else 'float64')
+            frame[profile['name']] = series
+        return pd.DataFrame(frame)
+
+    def chunks(self, rows, chunk_rows):
+        for start in range(0, rows, chunk_rows):
+            yield self.chunk(start, min(chunk_rows, rows - start))
+
+
+def write_parquet(generator, path, rows, chunk_rows):
+    writer = None
+    try:
+        for chunk in generator.chunks(rows, chunk_rows):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def generate(output, scale, chunk_rows=200_000, seed=0, data_dir=None):
+    os.makedirs(output, exist_ok=True)
+    written = {}
+    for i, name in enumerate(('nea', 'phl')):
+        profile = learn(data_store.load(name, data_dir=data_dir), names=NAME_COLS[name])
+        with open(os.path.join(output, f'{name}.profile.json'), 'w') as f:
+            json.dump(profile, f)
+        rows = int(profile['rows'] * scale)
+        path = os.path.join(output, f'{name}.parquet')
+        write_parquet(Generator(profile, seed + i), path, rows, chunk_rows)
+        written[name] = (path, rows)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère des catalogues NEA et PHL synthétiques au format Parquet.")
+    parser.add_argument('output', help="dossier de sortie")
+    parser.add_argument('--scale', type=float, default=100, help="taille par rapport aux catalogues réels")
+    parser.add_argument('--chunk-rows', type=int, default=200_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=None)
+    args = parser.parse_args(argv)
+
+    for name, (path, rows) in generate(args.output, args.scale, args.chunk_rows, args.seed, args.data_dir).items():
+        print(f'{name}: {rows} lignes -> {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Sorted-array index of the merged NEA/PHL catalog for the habitable zone.
+
+Each indexed column is argsorted once per dataset version. A range query is
+a binary search on the most selective column, the other bounds are only
+checked on the rows it returns, so the sliders of the zone chart do not scan
+the catalog.
+"""
+import numpy as np
+import pandas as pd
+
+
+# colonnes indexées : distance planète/étoile, température de l'étoile, distance à la Terre
+INDEX_COLS = ('P_DISTANCE', 'S_TEMPERATURE', 'sy_dist')
+
+
+class ZoneIndex:
+
+    def __init__(self, frame, columns=INDEX_COLS):
+        # the frame is kept as is, the queries return positions in it
+        self.frame = frame
+        self.values = {}
+        self._order = {}
+        self._sorted = {}
+        for col in columns:
+            values = frame[col].to_numpy(dtype='float64')
+            order = np.argsort(values, kind='stable')
+            # NaN are sorted last and never match a query
+            order = order[:np.count_nonzero(~np.isnan(values))]
+            self.values[col] = values
+            self._order[col] = order
+            self._sorted[col] = values[order]
+        self.habitable = frame['P_HABITABLE'].isin([1, 2]).to_numpy()
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _bounds(self, col, low, high, inclusive):
+        # slice of the sorted column between low and high
+        values = self._sorted[col]
+        start = 0 if low is None else np.searchsorted(values, low, side='left' if inclusive else 'right')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right' if inclusive else 'left')
+        return start, max(start, stop)
+
+    def query(self, inclusive=False, **bounds):
+        # positions of the rows with low < col < high for each col=(low, high), in the order of the frame
+        slices = {col: self._bounds(col, low, high, inclusive) for col, (low, high) in bounds.items()}
+        if not slices:
+            return np.arange(len(self))
+        first = min(slices, key=lambda col: slices[col][1] - slices[col][0])
+        start, stop = slices[first]
+        rows = self._order[first][start:stop]
+        for col, (low, high) in bounds.items():
+            if col == first:
+                continue
+            values = self.values[col][rows]
+            keep = ~np.isnan(values)
+            if low is not None:
+                keep &= values >= low if inclusive else values > low
+            if high is not None:
+                keep &= values <= high if inclusive else values < high
+            rows = rows[keep]
+        return np.sort(rows)
+
+    def nearest(self, col, k=1, where=None):
+        # positions of the k rows with the smallest values of col, among the rows where `where` is True
+        order = self._order[col]
+        if where is None:
+            return order[:k]
+        found = []
+        start, step = 0, max(64, 4 * k)
+        while start < len(order) and sum(len(f) for f in found) < k:
+            chunk = order[start:start + step]
+            found.append(chunk[where[chunk]])
+            start += step
+            step *= 2
+        return np.concatenate(found)[:k] if found else order[:0]
+
+    def take(self, rows, columns):
+        # new frame holding only the requested rows and columns, the catalog itself is not copied
+        frame = self.frame
+        return pd.DataFrame({col: frame[col].to_numpy()[rows] for col in columns}, index=frame.index[rows])
+
+    def range(self, col):
+        # smallest and largest known values, for the limits of the sliders
+        values = self._sorted[col]
+        return (float(values[0]), float(values[-1])) if len(values) else (0.0, 0.0)